@@ -18,6 +18,14 @@ const projectRoot = path.resolve(__dirname, '..');
 const tsFilePath = path.join(projectRoot, 'common', 'frontend_tools.ts');
 const tsContent = fs.readFileSync(tsFilePath, 'utf8');
 
+// Render a JSON string as an ASCII-only Python bytes literal
+function toPythonBytesLiteral(json) {
+  const ascii = json.replace(/[\u007f-\uffff]/g, ch =>
+    '\\u' + ch.charCodeAt(0).toString(16).padStart(4, '0')
+  );
+  return "b'" + ascii.replace(/\\/g, '\\\\').replace(/'/g, "\\'") + "'";
+}
+
 // Generate Python code
 function generatePythonCode() {
   // Extract tool names from the enum
@@ -43,8 +51,14 @@ function generatePythonCode() {
 # This file is auto-generated from frontend_tools.ts
 # To make changes, edit the TypeScript file and run the generator
 
+import json
 from enum import Enum
-from typing import Dict, List, Any, Optional, Union
+from typing import Any, Dict, Final, List, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # -----------------------------------------------------------------------------
 # Tool Name Enum
@@ -223,7 +237,13 @@ class FrontendToolName(str, Enum):
   // Log summary of found functions
   console.log(`Found ${schemaFunctions.length} schema functions`);
 
-  // Generate Python schema functions
+  // Enum member name -> tool name string, used for the schema "name" field
+  const toolValues = Object.fromEntries(toolNames.map(tool => [tool.name, tool.value]));
+
+  // Generate Python schema JSON literals and getter functions
+  const schemaJsonLiterals = [];
+  let schemaGetters = '';
+  let schemaGetterIndex = 0;
   for (const func of schemaFunctions) {
     // Extract the tool name from the function name
     // For example, from "getAskUserQuestionConfirmationApprovalInputSchema" to "ask_user_confirmation"
@@ -239,38 +259,46 @@ class FrontendToolName(str, Enum):
       snakeName = func.enumName.toLowerCase();
     }
 
-    // Format the parameters object for Python
-    // This is a simple conversion that works for basic JSON structures
-    let pyParameters = func.parameters
-      .replace(/"/g, '\\"')  // Escape double quotes
-      .replace(/\\"/g, '"')  // Unescape already escaped quotes
-      .replace(/(\w+):/g, '"$1":')  // Add quotes to property names
-      .replace(/'/g, "\\'");  // Escape single quotes
-
-    // Add the Python function definition
-    pythonCode += `
-def get_${snakeName}_schema() -> Dict[str, Any]:
-    """Generate schema for the ${snakeName} tool"""
-    return {
-        "name": FrontendToolName.${func.enumName},
-        "description": "${func.description}",
-        "parameters": ${pyParameters}
+    // Build the schema as a plain object so it can be embedded as JSON
+    let description = func.description;
+    try {
+      description = JSON.parse(`"${func.description}"`); // Resolve any string escapes
+    } catch (e) {
+      // Keep the raw description if it is not a valid JSON string body
     }
+    const schema = {
+      name: toolValues[func.enumName],
+      description,
+      parameters: JSON.parse(func.parameters)
+    };
+    schemaJsonLiterals.push(toPythonBytesLiteral(JSON.stringify(schema)));
+
+    // The getter hands back the shared dict decoded from the JSON blob below
+    schemaGetters += `
+def get_${snakeName}_schema() -> Dict[str, Any]:
+    """Get the schema for the ${snakeName} tool (shared; copy before mutating)"""
+    return _ALL_SCHEMAS[${schemaGetterIndex}]
 `;
+    schemaGetterIndex++;
   }
 
-  // Generate the list of schema names for get_all_frontend_tool_schemas
-  const schemaNames = schemaFunctions.map(func =>
-    `get_${func.enumName.toLowerCase()}_schema()`
-  );
-
-  // Add the function to get all schemas
+  // The schemas are embedded as pre-serialized JSON bytes (one literal per
+  // tool, joined by the Python compiler) and decoded once at import, which is
+  // cheaper than executing the equivalent nested dict literals.
   pythonCode += `
+_ALL_SCHEMAS_JSON: Final[bytes] = (
+    b'['
+    ${schemaJsonLiterals.join(" b','\n    ")}
+    b']'
+)
+
+_ALL_SCHEMAS: Final[Tuple[Dict[str, Any], ...]] = tuple(
+    orjson.loads(_ALL_SCHEMAS_JSON) if orjson else json.loads(_ALL_SCHEMAS_JSON)
+)
+${schemaGetters}
 def get_all_frontend_tool_schemas() -> List[Dict[str, Any]]:
-    """Get all frontend tool schemas"""
-    return [
-        ${schemaNames.join(',\n        ')}
-    ]
+    """Get all frontend tool schemas (the schema dicts themselves are shared)"""
+    return list(_ALL_SCHEMAS)
 `;
 
   return pythonCode;
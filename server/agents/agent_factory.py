@@ -0,0 +1,83 @@
+# agent_factory.py
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Tuple
+
+from agno.agent import Agent
+from storage import AGENT_STORAGE as agent_storage
+
+# Model and toolkit modules are heavy (httpx, playwright, MCP), so they are
+# imported lazily inside the cached getters below.
+if TYPE_CHECKING:
+    from agno.models.google import Gemini
+    from agno.tools.crawl4ai import Crawl4aiTools
+    from agno.tools.googlesearch import GoogleSearchTools
+    from tools.browser_tool import AgnoBrowserToolkit
+
+# Agno debug output is verbose and sits on the per-turn path; opt in with AGNO_DEBUG=1
+_DEBUG = os.getenv("AGNO_DEBUG", "0") == "1"
+
+
+class AgentProfile(NamedTuple):
+    """Everything that differs between the agents built by `build_agent`."""
+    name: str
+    description: str
+    instructions: Tuple[str, ...]
+    model_id: str
+    tool_factories: Tuple[Callable[[], Any], ...] = ()
+    retries: int = 0
+
+
+@lru_cache(maxsize=None)
+def get_gemini(model_id: str) -> "Gemini":
+    """
+    Builds one Gemini model client per model id and reuses it for every agent,
+    so agents on the same model share a single underlying HTTP client.
+    """
+    from agno.models.google import Gemini
+    return Gemini(id=model_id)
+
+@lru_cache(maxsize=None)
+def get_search_tools() -> "GoogleSearchTools":
+    """Builds the Google search toolkit once and reuses it for every agent."""
+    from agno.tools.googlesearch import GoogleSearchTools
+    return GoogleSearchTools()
+
+@lru_cache(maxsize=None)
+def get_crawl4ai_tools(max_length: int = 10000) -> "Crawl4aiTools":
+    """Builds one Crawl4ai toolkit per `max_length` and reuses it for every agent."""
+    from agno.tools.crawl4ai import Crawl4aiTools
+    return Crawl4aiTools(max_length=max_length)
+
+@lru_cache(maxsize=None)
+def get_browser_toolkit() -> "AgnoBrowserToolkit":
+    """Builds the browser toolkit (and its HTTP client) once and reuses it."""
+    from tools.browser_tool import AgnoBrowserToolkit
+    return AgnoBrowserToolkit()
+
+
+@lru_cache(maxsize=8)
+def build_agent(profile: AgentProfile, *extra_tools: Any) -> Agent:
+    """
+    Creates and configures an Agno agent instance for the given profile.
+    The agent is cached per (profile, extra_tools), so repeated calls with the
+    same arguments return the already-built agent.
+    Args:
+        profile (AgentProfile): The agent's name, prompt, model and tools.
+        *extra_tools: Already-initialized tools (e.g. MCPTools) placed ahead
+            of the profile's own tools.
+    Returns:
+        Agent: Configured Agno agent instance
+    """
+    return Agent(
+        name=profile.name,
+        description=profile.description,
+        instructions=list(profile.instructions),
+        model=get_gemini(profile.model_id),
+        retries=profile.retries,
+        tools=[*extra_tools, *(factory() for factory in profile.tool_factories)],
+        markdown=True,
+        add_datetime_to_instructions=True,
+        debug_mode=_DEBUG,
+        storage=agent_storage,
+    )
@@ -1,9 +1,17 @@
 # agno_adapter.py
-import asyncio
+import itertools
 import json
 import logging
-from typing import AsyncGenerator, Any, Dict, List, Optional, Union
-from uuid import uuid4
+import secrets
+from collections import OrderedDict
+from time import monotonic
+from types import MappingProxyType
+from typing import AsyncGenerator, Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+try:
+    import orjson  # Optional: faster encoder that emits bytes directly
+except ImportError:
+    orjson = None
 
 # --- Pydantic ---
 from pydantic import BaseModel, Field as PydanticField # Alias to avoid conflict with Agno's File
@@ -17,9 +25,12 @@ from agno.utils.log import log_debug, log_error, log_info, logger # Use the conf
 
 # --- Frontend Tool Imports ---
 import sys
-import os
-# Add the project root to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pathlib import Path
+# Make the project root (home of the shared `common` directory) importable. It is
+# appended, and only once, so stdlib and installed packages still resolve first.
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 from common.frontend_tools import FrontendToolName
 
 # --- Vercel AI SDK Data Stream Protocol Type IDs ---
@@ -34,6 +45,81 @@ REASONING_PART = "g"
 SOURCE_PART = "h"
 # ... add other type IDs as needed ...
 
+# Parts whose payload is always sent as a JSON string
+_STRING_PAYLOAD_PARTS = frozenset((TEXT_PART, ERROR_PART, REASONING_PART))
+
+# Pre-encoded `type_id:` prefixes so each frame is built directly as bytes
+_PREFIX_BYTES: Dict[str, bytes] = {
+    type_id: f"{type_id}:".encode("utf-8")
+    for type_id in (TEXT_PART, DATA_PART, ERROR_PART, ANNOTATION_PART, TOOL_CALL_PART,
+                    TOOL_RESULT_PART, FINISH_MESSAGE_PART, REASONING_PART, SOURCE_PART)
+}
+
+
+if orjson is not None:
+    def _json_dumps_bytes(data: Any, default: Optional[Any] = None) -> bytes:
+        return orjson.dumps(data, default=default, option=orjson.OPT_NON_STR_KEYS)
+    _json_loads = orjson.loads # orjson.JSONDecodeError subclasses json.JSONDecodeError
+
+    def _json_dumps_indented(data: Any) -> str:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+else:
+    def _json_dumps_bytes(data: Any, default: Optional[Any] = None) -> bytes:
+        return json.dumps(data, default=default).encode("utf-8")
+    _json_loads = json.loads
+
+    def _json_dumps_indented(data: Any) -> str:
+        return json.dumps(data, indent=2)
+
+
+# Fixed frames, encoded once at import
+_FINISH_STOP_FRAME = _PREFIX_BYTES[FINISH_MESSAGE_PART] + _json_dumps_bytes({"finishReason": "stop"}) + b"\n"
+_STREAM_ERROR_TEXT_FRAME = _PREFIX_BYTES[TEXT_PART] + _json_dumps_bytes(
+    "I encountered an issue processing your request. Please feel free to continue our conversation or try rephrasing your question."
+) + b"\n"
+
+
+# Opens the frontend tools block in the agent instructions; also used to detect an existing block
+_FRONTEND_TOOLS_INSTRUCTIONS_HEADER = "\n\n## Interacting with the User Interface (Frontend Actions)\n\n"
+
+
+# Result the proxy tool hands back to the agent; it is the same for every frontend action
+_PROXY_TOOL_ACK = "Request to trigger the frontend action has been queued. The result of frontend tool may be passed back in subsequent call and accordingly you can respond further and take any other action."
+
+
+# Shared read-only stand-in for a missing nested mapping, so lookups don't allocate a fresh {}
+_EMPTY_MAPPING = MappingProxyType({})
+
+
+class _RecentIds(OrderedDict):
+    """Insertion-ordered set of ids (optionally with a value each) that forgets the oldest ones beyond `maxlen`."""
+
+    def __init__(self, maxlen: int = 4096):
+        super().__init__()
+        self.maxlen = maxlen
+
+    def add(self, key: Any, value: Any = None) -> None:
+        self[key] = value
+        if len(self) > self.maxlen:
+            self.popitem(last=False)
+
+
+class _ToolCallView(NamedTuple):
+    """Name, raw args and id of one Agno tool call, read from its dict once."""
+    name: Optional[str]
+    args: Any
+    id: Optional[str]
+
+    @classmethod
+    def from_agno(cls, tool_call_data: Dict[str, Any]) -> "_ToolCallView":
+        # Agno uses flat `tool_*` keys; OpenAI-style `function`/`id` keys are the fallback
+        function = tool_call_data.get("function") or _EMPTY_MAPPING
+        return cls(
+            tool_call_data.get("tool_name", function.get("name")),
+            tool_call_data.get("tool_args", function.get("arguments")),
+            tool_call_data.get("tool_call_id", tool_call_data.get("id")),
+        )
+
 
 class FrontendToolSchema(BaseModel):
     name: str
@@ -54,12 +140,40 @@ class AgnoVercelAdapter:
 
     def __init__(self,
                  agent: Agent,
-                 frontend_tool_schemas: Optional[List[FrontendToolSchema]] = None):
-        if not isinstance(agent, Agent):
+                 frontend_tool_schemas: Optional[List[FrontendToolSchema]] = None,
+                 chunk_size: int = 4,
+                 max_delay_ms: float = 30.0):
+        # Duck-typed: the adapter only needs an agent it can `arun` (an agno.Agent in practice)
+        if not hasattr(agent, "arun"):
             raise TypeError("Input must be an instance of agno.Agent")
         self.agent = agent
         self.frontend_tool_schemas: List[FrontendToolSchema] = frontend_tool_schemas or []
         self._agent_instructions_updated = False
+        self._frontend_tools_instructions = self._build_frontend_tools_instructions() # Static per adapter
+        self._proxy_registered = False
+        # Names of the tools on the agent; kept in step with agent.tools by this adapter
+        self._known_tool_names = {getattr(t, 'name', None) for t in agent.tools or ()}
+        # Fallback ids for tool calls Agno sent without one: a random per-adapter prefix
+        # keeps them distinct across restarts, the counter keeps them unique within it.
+        self._fallback_tool_id_prefix = f"backend_tool_{secrets.token_hex(4)}_"
+        self._fallback_tool_ids = itertools.count()
+        self._proxy_tool = self._get_proxy_tool_definition() # Built once; the schema is static
+        # Per-event handlers for everything except streamed text (see _agno_to_vercel_stream).
+        # RunResponse.event is the plain string value, so that is what the dict is keyed on.
+        self._event_handlers: Dict[str, Callable[[RunResponse], Optional[List[bytes]]]] = {
+            RunEvent.tool_call_started.value: self._on_tool_call_started,
+            RunEvent.tool_call_completed.value: self._on_tool_call_completed,
+            RunEvent.run_error.value: self._on_run_error,
+            RunEvent.run_completed.value: self._on_run_completed,
+            RunEvent.reasoning_step.value: self._on_reasoning_step,
+        }
+        # Text tokens are coalesced into one TEXT_PART frame every `chunk_size` tokens
+        # or `max_delay_ms`, whichever comes first (chunk_size=1 sends every token).
+        self.chunk_size = max(1, chunk_size)
+        self.max_delay = max_delay_ms / 1000.0
+        # Tool tracking state must exist before the first request, which need not end with a user message
+        self._parsed_tool_args = _RecentIds() # tool call id -> (raw args, decoded args)
+        self._reset_tool_tracking()
 
         self._ensure_proxy_tool_registered()
         self._update_agent_instructions_with_frontend_tools()
@@ -67,12 +181,16 @@ class AgnoVercelAdapter:
 
     def _ensure_proxy_tool_registered(self):
         """Ensures the proxy tool is part of the agent's tools."""
-        proxy_tool_func_def = self._get_proxy_tool_definition()
+        # The adapter owns the agent's tool list after construction, so one scan is enough
+        if self._proxy_registered:
+            return
+
         if self.agent.tools is None:
             self.agent.tools = []
 
-        if not any(getattr(t, 'name', None) == self.PROXY_TOOL_NAME for t in self.agent.tools):
-            self.agent.tools.append(proxy_tool_func_def)
+        if self.PROXY_TOOL_NAME not in self._known_tool_names:
+            self.agent.tools.append(self._proxy_tool)
+            self._known_tool_names.add(self.PROXY_TOOL_NAME)
             log_info(f"[Agno-Vercel Adapter][{self.agent.name}]: Registered proxy tool '{self.PROXY_TOOL_NAME}'.")
             # Agno might require a re-initialization or model update if tools change dynamically
             # This depends on Agno's internal workings. For now, we assume it's handled
@@ -80,74 +198,95 @@ class AgnoVercelAdapter:
             # Example: if hasattr(self.agent, 'update_model'): self.agent.update_model(session_id="proxy_tool_init")
         else:
             log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Proxy tool '{self.PROXY_TOOL_NAME}' already registered.")
+        self._proxy_registered = True
 
 
-    def _update_agent_instructions_with_frontend_tools(self):
+    def _build_frontend_tools_instructions(self) -> str:
         """
-        Updates the agent's instructions to include information about
-        available frontend tools and how to call them using the proxy tool.
+        Builds the instructions block describing the available frontend tools
+        and how to call them using the proxy tool. Empty when there are no tools.
         """
-        if self._agent_instructions_updated or not self.frontend_tool_schemas:
-            return
+        if not self.frontend_tool_schemas:
+            return ""
 
-        instruction_header = "\n\n## Interacting with the User Interface (Frontend Actions)\n\n"
-        instruction_body = (
+        first_tool_name = self.frontend_tool_schemas[0].name
+        parts = [
+            _FRONTEND_TOOLS_INSTRUCTIONS_HEADER,
             f"To request actions or display specific UI components on the frontend, "
             f"you MUST use the '{self.PROXY_TOOL_NAME}' tool. "
             "This tool acts as a bridge to the frontend.\n\n"
             f"The '{self.PROXY_TOOL_NAME}' tool requires the following arguments:\n"
             f"- `frontend_tool_name` (string, required): The specific name of the action the frontend should perform.\n"
             f"- `frontend_tool_args` (object, required): A JSON object containing the arguments for that frontend action.\n\n"
-            "Available frontend actions and their argument schemas:\n"
-        )
+            "Available frontend actions and their argument schemas:\n",
+        ]
 
         for schema in self.frontend_tool_schemas:
-            instruction_body += f"\n### Frontend Action: `{schema.name}`\n"
-            instruction_body += f"Description: {schema.description}\n"
-            instruction_body += f"Arguments (`frontend_tool_args` for this action):\n```json\n"
-            instruction_body += json.dumps(schema.parameters, indent=2)
-            instruction_body += "\n```\n"
-
-        instruction_body += (
-            f"\nExample of how to call '{self.PROXY_TOOL_NAME}' to trigger the '{self.frontend_tool_schemas[0].name}' frontend action:\n"
+            parts.append(
+                f"\n### Frontend Action: `{schema.name}`\n"
+                f"Description: {schema.description}\n"
+                f"Arguments (`frontend_tool_args` for this action):\n```json\n"
+                f"{_json_dumps_indented(schema.parameters)}\n```\n"
+            )
+
+        parts.append(
+            f"\nExample of how to call '{self.PROXY_TOOL_NAME}' to trigger the '{first_tool_name}' frontend action:\n"
             f"Tool Name: {self.PROXY_TOOL_NAME}\n"
             f"Tool Arguments: {{\n"
-            f'  "frontend_tool_name": "{self.frontend_tool_schemas[0].name}",\n'
-            f'  "frontend_tool_args": {{ ...args matching {self.frontend_tool_schemas[0].name} schema... }}\n'
+            f'  "frontend_tool_name": "{first_tool_name}",\n'
+            f'  "frontend_tool_args": {{ ...args matching {first_tool_name} schema... }}\n'
             f"}}\n"
         )
+        return "".join(parts)
 
-        full_instructions = instruction_header + instruction_body
 
-        if not self.agent.instructions:
-            self.agent.instructions = []
+    def _update_agent_instructions_with_frontend_tools(self):
+        """
+        Updates the agent's instructions to include information about
+        available frontend tools and how to call them using the proxy tool.
+        """
+        if self._agent_instructions_updated or not self._frontend_tools_instructions:
+            return
+
+        full_instructions = self._frontend_tools_instructions
 
-        if self.agent.instructions:
-            if isinstance(self.agent.instructions, str):
-                self.agent.instructions += full_instructions
-            elif isinstance(self.agent.instructions, list):
-                self.agent.instructions.append(full_instructions)
+        # The agent may be shared (agents are cached), so another adapter may already have added the block
+        instructions = self.agent.instructions
+        if not instructions:
+            self.agent.instructions = [full_instructions]
+        elif isinstance(instructions, str):
+            if _FRONTEND_TOOLS_INSTRUCTIONS_HEADER not in instructions:
+                self.agent.instructions = instructions + full_instructions
+        elif isinstance(instructions, list):
+            if not any(isinstance(instruction, str) and _FRONTEND_TOOLS_INSTRUCTIONS_HEADER in instruction
+                       for instruction in instructions):
+                instructions.append(full_instructions)
 
         self._agent_instructions_updated = True
         log_info(f"[Agno-Vercel Adapter][{self.agent.name}]: Updated agent instructions with frontend tool schemas.")
 
 
     @staticmethod
-    def _format_vercel_data_stream(type_id: str, data: Any) -> str:
+    def _format_vercel_data_stream(type_id: str, data: Any) -> bytes:
         """Formats data according to the Vercel AI SDK Data Stream Protocol."""
         try:
-            if type_id in [TEXT_PART, ERROR_PART, REASONING_PART]:
-                 payload = json.dumps(str(data))
+            if type_id in _STRING_PAYLOAD_PARTS:
+                 # Deltas are almost always str already; only stringify anything else
+                 payload = _json_dumps_bytes(data if type(data) is str else str(data))
             else:
-                 payload = json.dumps(data, default=str) # default=str for complex objects
-        except TypeError as e:
+                try:
+                    # Tool call and finish payloads are plain JSON almost always, so the
+                    # str() fallback hook is only installed when that is not the case.
+                    payload = _json_dumps_bytes(data)
+                except TypeError:
+                    payload = _json_dumps_bytes(data, default=str) # default=str for complex objects
+        except TypeError as e: # orjson.JSONEncodeError is a TypeError too
             log_error(f"[Agno-Vercel Adapter]: Serialization error for type {type_id}: {data}. Error: {e}")
-            payload = json.dumps({"error": "Serialization failed", "details": str(e)})
+            payload = _json_dumps_bytes({"error": "Serialization failed", "details": str(e)})
             type_id = ERROR_PART
 
         # Format according to Vercel AI SDK Data Stream Protocol
-        formatted = f"{type_id}:{payload}\n"
-        return formatted
+        return _PREFIX_BYTES[type_id] + payload + b"\n"
 
     def _get_proxy_tool_definition(self) -> Function:
         """Creates the definition for the proxy tool Agno agent will call."""
@@ -176,7 +315,9 @@ class AgnoVercelAdapter:
     async def _handle_proxy_tool_call(self, frontend_tool_name: str, frontend_tool_args: Dict[str, Any]) -> str:
         """
         This method is executed by Agno's agent when it calls the PROXY_TOOL_NAME.
-        It simply returns a confirmation string to the Agno agent.
+        It simply returns a confirmation string to the Agno agent. It stays a coroutine
+        because Agno's `arun` awaits coroutine entrypoints directly but runs sync ones
+        in a worker thread.
         The actual triggering of the frontend UI update happens in the
         `_agno_to_vercel_stream` method when it processes the `tool_call_started`
         event for this proxy tool.
@@ -184,7 +325,195 @@ class AgnoVercelAdapter:
         log_info(f"[Agno-Vercel Adapter][{self.agent.name}]: Proxy tool '{self.PROXY_TOOL_NAME}' called by agent. Frontend action '{frontend_tool_name}' with args {frontend_tool_args} will be requested from UI.")
         # This result goes back to the Agno agent's internal state.
         # It does NOT go directly to the frontend from here.
-        return f"Request to trigger frontend action '{frontend_tool_name}' has been queued. The result of frontend tool may be passed back in subsequent call and accordingly you can respond further and take any other action."
+        return _PROXY_TOOL_ACK
+
+    def _on_tool_call_started(self, agno_response: RunResponse) -> Optional[List[bytes]]:
+        tools = agno_response.tools # This will contain the call to PROXY_TOOL_NAME
+        if not tools:
+            return None
+
+        frames: List[bytes] = []
+        tool_calls = [_ToolCallView.from_agno(tool_call_data) for tool_call_data in tools] # Agno's tool_call structure
+        for tool_call in tool_calls:
+            agno_tool_args_raw = tool_call.args
+            agno_tool_call_id = tool_call.id
+
+            if tool_call.name == self.PROXY_TOOL_NAME:
+                if agno_tool_call_id is not None: # Its completion is not forwarded (see _on_tool_call_completed)
+                    self._active_proxy_ids.add(agno_tool_call_id)
+                if logger.isEnabledFor(logging.DEBUG):
+                    log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Intercepted proxy tool call ID '{agno_tool_call_id}' to trigger frontend.")
+
+                # Arguments for PROXY_TOOL_NAME were set by the LLM
+                # These arguments *contain* the actual frontend tool name and its args
+                proxy_call_args = {}
+                if isinstance(agno_tool_args_raw, str):
+                    try:
+                        proxy_call_args = self._parse_tool_args(agno_tool_call_id, agno_tool_args_raw)
+                    except json.JSONDecodeError:
+                        log_error(f"[Agno-Vercel Adapter] Failed to parse proxy tool args: {agno_tool_args_raw}")
+                        proxy_call_args = {"error": "Invalid proxy arguments"}
+                elif isinstance(agno_tool_args_raw, dict):
+                    proxy_call_args = agno_tool_args_raw
+
+                frontend_tool_name_to_call = proxy_call_args.get("frontend_tool_name", "unknown_frontend_action")
+                frontend_tool_args_for_call = proxy_call_args.get("frontend_tool_args", {})
+
+                vercel_tool_request = {
+                    "toolCallId": agno_tool_call_id, # Use Agno's ID for the proxy call
+                    "toolName": frontend_tool_name_to_call,
+                    "args": frontend_tool_args_for_call,
+                }
+                formatted_data = self._format_vercel_data_stream(TOOL_CALL_PART, vercel_tool_request)
+                if logger.isEnabledFor(logging.DEBUG):
+                    log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending tool call event: {formatted_data}")
+                # Since this specific tool_call_data was for the proxy, we've handled it.
+                # Processed the proxy tool, move to next agno_response
+                return [formatted_data]
+
+        # If not a proxy call, handle backend tools (if any) as before
+        # This allows backend tools and frontend proxy tools to coexist
+        for tool_call in tool_calls:
+            tool_call_id = tool_call.id if tool_call.id is not None else f"{self._fallback_tool_id_prefix}{next(self._fallback_tool_ids)}"
+
+            # Skip if we've already processed this tool call start
+            if tool_call_id in self._processed_tool_call_starts:
+                if logger.isEnabledFor(logging.DEBUG):
+                    log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Skipping already processed tool call start: {tool_call_id}")
+                continue
+
+            # Mark this tool call as processed
+            self._processed_tool_call_starts.add(tool_call_id)
+
+            args_obj = {}
+            tool_args_raw = tool_call.args
+            if tool_args_raw:
+                if isinstance(tool_args_raw, str):
+                    try:
+                        # Fallback ids are fresh on every event, so caching under them would never hit
+                        args_obj = self._parse_tool_args(tool_call.id, tool_args_raw)
+                    except json.JSONDecodeError:
+                        args_obj = {"raw_args": tool_args_raw}
+                elif isinstance(tool_args_raw, dict):
+                    args_obj = tool_args_raw
+
+            vercel_backend_tool_display = {
+                "toolCallId": tool_call_id,
+                "toolName": self.BACKEND_TOOL_DISPLAY_NAME, # Generic name for UI to display
+                "args": { # Frontend receives details about the backend tool
+                    "actual_tool_name": tool_call.name,
+                    "actual_tool_args": args_obj
+                }
+            }
+            formatted_data = self._format_vercel_data_stream(TOOL_CALL_PART, vercel_backend_tool_display)
+            if logger.isEnabledFor(logging.DEBUG):
+                log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending tool call event: {formatted_data}")
+            frames.append(formatted_data)
+        return frames
+
+    def _on_tool_call_completed(self, agno_response: RunResponse) -> Optional[List[bytes]]:
+        tools = agno_response.tools
+        if not tools:
+            return None
+
+        # Ignore the completion of the proxy tool call itself for Vercel stream
+        # as the proxy tool's "result" ("Frontend action requested.") is internal to Agno.
+        # Proxy calls are recognised by the ids recorded when they started (by name if Agno sent no id).
+        # Send tool completion events to the frontend
+        frames: List[bytes] = []
+        for tool_call_data in tools:
+            tool_call_id = tool_call_data.get("tool_call_id", tool_call_data.get("id"))
+            if tool_call_id is None:
+                if tool_call_data.get("tool_name") == self.PROXY_TOOL_NAME:
+                    continue
+            elif tool_call_id in self._active_proxy_ids:
+                if tool_call_data.get("content"): # Finished; repeats in later events are skipped as processed
+                    self._active_proxy_ids.discard(tool_call_id)
+                    self._processed_tool_call_completions.add(tool_call_id)
+                continue
+
+            # Skip if we've already processed this tool call completion
+            if tool_call_id in self._processed_tool_call_completions:
+                if logger.isEnabledFor(logging.DEBUG):
+                    log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Skipping already processed tool call completion: {tool_call_id}")
+                continue
+
+            tool_result = tool_call_data.get("content")
+            if not tool_result:
+                # if there is no content / response from tool, tool is still executing, so dont process.
+                # In case of parallel tool calling, Agno send the list of all tools whenever any of those tools complete
+                # so we just need to process the tool call for which we received content, not other as they are still in call.
+                continue
+
+            # Mark this tool call completion as processed; its arguments won't be parsed again
+            self._processed_tool_call_completions.add(tool_call_id)
+            self._parsed_tool_args.pop(tool_call_id, None)
+
+            # Get the original tool args if available
+            tool_args = {}
+            if tool_call_id in self._processed_tool_call_starts:
+                # We found the matching start tool call
+                tool_args = {
+                    "actual_tool_name": tool_call_data.get("tool_name", "unknown_tool"),
+                    "actual_tool_args": tool_call_data.get("tool_args", {}),
+                    "actual_tool_results": tool_result
+                }
+
+            # Create a tool call result to send to the frontend
+            # Use display_tool_info as the tool name to match what was sent in the tool call started event
+            vercel_tool_result = {
+                "toolCallId": tool_call_id,
+                "toolName": self.BACKEND_TOOL_DISPLAY_NAME,  # Use display_tool_info instead of the actual tool name
+                "args": tool_args,  # Include args as required by Vercel AI SDK
+                "state": "result",
+                "result": "Actual tool result is in `args.actual_tool_results`"
+            }
+
+            # Format the tool completion event as a tool call part
+            formatted_data = self._format_vercel_data_stream(TOOL_CALL_PART, vercel_tool_result)
+            if logger.isEnabledFor(logging.DEBUG):
+                log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending tool completion event: {formatted_data}")
+            frames.append(formatted_data)
+        return frames
+
+    def _on_run_error(self, agno_response: RunResponse) -> Optional[List[bytes]]:
+        if not agno_response.content:
+            return None
+        formatted_data = self._format_vercel_data_stream(ERROR_PART, str(agno_response.content))
+        log_error(f"[Agno-Vercel Adapter][{self.agent.name}]: Error in run: {formatted_data}")
+        return [formatted_data]
+
+    def _on_run_completed(self, agno_response: RunResponse) -> Optional[List[bytes]]:
+        metrics = agno_response.metrics
+        if not metrics:
+            formatted_data = _FINISH_STOP_FRAME
+        else:
+            prompt_tokens = int(metrics.get("input_tokens", metrics.get("prompt_tokens", 0)))
+            completion_tokens = int(metrics.get("output_tokens", metrics.get("completion_tokens", 0)))
+            total_tokens = int(metrics.get("total_tokens", 0)) or prompt_tokens + completion_tokens
+            finish_data = {
+                "finishReason": "stop",
+                "usage": {
+                    "promptTokens": prompt_tokens,
+                    "completionTokens": completion_tokens,
+                    "totalTokens": total_tokens,
+                },
+            }
+            formatted_data = self._format_vercel_data_stream(FINISH_MESSAGE_PART, finish_data)
+        if logger.isEnabledFor(logging.DEBUG):
+            log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending finish message: {formatted_data}")
+        return [formatted_data]
+
+    def _on_reasoning_step(self, agno_response: RunResponse) -> Optional[List[bytes]]:
+        content = agno_response.content
+        if not content:
+            return None
+        if not isinstance(content, str):
+            return []
+        formatted_data = self._format_vercel_data_stream(REASONING_PART, content)
+        if logger.isEnabledFor(logging.DEBUG):
+            log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending reasoning step: {formatted_data}")
+        return [formatted_data]
 
     async def _agno_to_vercel_stream(
         self,
@@ -193,193 +522,68 @@ class AgnoVercelAdapter:
         # Use instance variables for tracking tool calls
         # (these are initialized in __init__ and reset in _reset_tool_tracking)
 
+        # The loop below runs once per streamed token, so attributes and globals
+        # it touches are bound to locals up front.
+        fmt = self._format_vercel_data_stream
+        handlers_get = self._event_handlers.get
+        run_response_event = RunEvent.run_response.value
+        chunk_size = self.chunk_size
+        max_delay = self.max_delay
+        agent_name = self.agent.name
+        # Frame reprs are only built for the debug log when it will actually be written
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+        # Pending text tokens, sent as a single TEXT_PART frame by flush_text()
+        text_buf: List[str] = []
+        text_buf_append = text_buf.append
+        text_buf_started = 0.0
+
+        def flush_text() -> bytes:
+            formatted = fmt(TEXT_PART, "".join(text_buf))
+            text_buf.clear()
+            return formatted
+
         try:
             async for agno_response in agno_response_stream:
                 event = agno_response.event
                 content = agno_response.content
-                tools = agno_response.tools # This will contain the call to PROXY_TOOL_NAME
-                metrics = agno_response.metrics
-                thinking = agno_response.thinking
-
-                if event == RunEvent.tool_call_started and tools:
-                    is_proxy_call_handled = False
-                    for tool_call_data in tools: # Agno's tool_call structure
-                        agno_tool_name = tool_call_data.get("tool_name", tool_call_data.get("function", {}).get("name"))
-                        agno_tool_args_raw = tool_call_data.get("tool_args", tool_call_data.get("function", {}).get("arguments"))
-                        agno_tool_call_id = tool_call_data.get("tool_call_id", tool_call_data.get("id"))
-
-                        if agno_tool_name == self.PROXY_TOOL_NAME:
-                            is_proxy_call_handled = True
-                            log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Intercepted proxy tool call ID '{agno_tool_call_id}' to trigger frontend.")
-
-                            # Arguments for PROXY_TOOL_NAME were set by the LLM
-                            # These arguments *contain* the actual frontend tool name and its args
-                            proxy_call_args = {}
-                            if isinstance(agno_tool_args_raw, str):
-                                try:
-                                    proxy_call_args = json.loads(agno_tool_args_raw)
-                                except json.JSONDecodeError:
-                                    log_error(f"[Agno-Vercel Adapter] Failed to parse proxy tool args: {agno_tool_args_raw}")
-                                    proxy_call_args = {"error": "Invalid proxy arguments"}
-                            elif isinstance(agno_tool_args_raw, dict):
-                                proxy_call_args = agno_tool_args_raw
-
-                            frontend_tool_name_to_call = proxy_call_args.get("frontend_tool_name", "unknown_frontend_action")
-                            frontend_tool_args_for_call = proxy_call_args.get("frontend_tool_args", {})
-
-                            vercel_tool_request = {
-                                "toolCallId": agno_tool_call_id, # Use Agno's ID for the proxy call
-                                "toolName": frontend_tool_name_to_call,
-                                "args": frontend_tool_args_for_call,
-                            }
-                            formatted_data = self._format_vercel_data_stream(TOOL_CALL_PART, vercel_tool_request).encode("utf-8")
-                            log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending tool call event: {formatted_data}")
-                            yield formatted_data
-                            log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sleeping for 0.01 seconds before next event...")
-                            await asyncio.sleep(0.01)
-                            # Since this specific tool_call_data was for the proxy, we've handled it.
-                            # If there were other non-proxy tools in the same 'tools' list, they'd be handled by the 'else' below.
-                            break # Processed the proxy tool, move to next agno_response
-
-                    if is_proxy_call_handled:
-                        continue # Move to the next event from Agno stream
-
-                    # If not a proxy call, handle backend tools (if any) as before
-                    # This allows backend tools and frontend proxy tools to coexist
-                    for tool_call_data in tools:
-                        tool_call_id = tool_call_data.get("tool_call_id", tool_call_data.get("id", f"backend_tool_{uuid4()}"))
-
-                        # Skip if we've already processed this tool call start
-                        if tool_call_id in self._processed_tool_call_starts:
-                            log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Skipping already processed tool call start: {tool_call_id}")
-                            continue
-
-                        # Mark this tool call as processed
-                        self._processed_tool_call_starts.add(tool_call_id)
-
-                        args_obj = {}
-                        tool_args_raw = tool_call_data.get("tool_args", tool_call_data.get("function", {}).get("arguments"))
-                        if tool_args_raw:
-                            if isinstance(tool_args_raw, str):
-                                try:
-                                    args_obj = json.loads(tool_args_raw)
-                                except json.JSONDecodeError:
-                                    args_obj = {"raw_args": tool_args_raw}
-                            elif isinstance(tool_args_raw, dict):
-                                args_obj = tool_args_raw
-
-                        vercel_backend_tool_display = {
-                            "toolCallId": tool_call_id,
-                            "toolName": self.BACKEND_TOOL_DISPLAY_NAME, # Generic name for UI to display
-                            "args": { # Frontend receives details about the backend tool
-                                "actual_tool_name": tool_call_data.get("tool_name", tool_call_data.get("function", {}).get("name")),
-                                "actual_tool_args": args_obj
-                            }
-                        }
-                        formatted_data = self._format_vercel_data_stream(TOOL_CALL_PART, vercel_backend_tool_display).encode("utf-8")
-                        log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending tool call event: {formatted_data}")
-                        yield formatted_data
-                        log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sleeping for 0.01 seconds before next event...")
-                        await asyncio.sleep(0.01)
-
-                elif event == RunEvent.run_response and content:
-                    # Format and send the text response
-                    formatted_data = self._format_vercel_data_stream(TEXT_PART, content).encode("utf-8")
-                    log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending text response event: {formatted_data}")
-                    yield formatted_data
-                    log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sleeping for 0.01 seconds before next event...")
-                    await asyncio.sleep(0.01)
-
-                # Handle tool call completion events
-                elif event == RunEvent.tool_call_completed and tools:
-                    # Ignore the completion of the proxy tool call itself for Vercel stream
-                    # as the proxy tool's "result" ("Frontend action requested.") is internal to Agno.
-                    if not any(tool_call.get("tool_name") == self.PROXY_TOOL_NAME for tool_call in tools):
-                        # Send tool completion events to the frontend
-                        for tool_call_data in tools:
-                            tool_call_id = tool_call_data.get("tool_call_id", tool_call_data.get("id"))
-
-                            # Skip if we've already processed this tool call completion
-                            if tool_call_id in self._processed_tool_call_completions:
-                                log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Skipping already processed tool call completion: {tool_call_id}")
-                                continue
-
-                            tool_result = tool_call_data.get("content")
-                            if not tool_result:
-                                # if there is no content / response from tool, tool is still executing, so dont process.
-                                # In case of parallel tool calling, Agno send the list of all tools whenever any of those tools complete
-                                # so we just need to process the tool call for which we received content, not other as they are still in call.
-                                continue
-
-                            # Mark this tool call completion as processed
-                            self._processed_tool_call_completions.add(tool_call_id)
-
-                            # Get the original tool args if available
-                            tool_args = {}
-                            for start_tool in self._processed_tool_call_starts:
-                                if start_tool == tool_call_id:
-                                    # We found the matching start tool call
-                                    tool_args = {
-                                        "actual_tool_name": tool_call_data.get("tool_name", "unknown_tool"),
-                                        "actual_tool_args": tool_call_data.get("tool_args", {}),
-                                        "actual_tool_results": tool_result
-                                    }
-                                    break
-
-                            # Create a tool call result to send to the frontend
-                            # Use display_tool_info as the tool name to match what was sent in the tool call started event
-                            vercel_tool_result = {
-                                "toolCallId": tool_call_id,
-                                "toolName": self.BACKEND_TOOL_DISPLAY_NAME,  # Use display_tool_info instead of the actual tool name
-                                "args": tool_args,  # Include args as required by Vercel AI SDK
-                                "state": "result",
-                                "result": "Actual tool result is in `args.actual_tool_results`"
-                            }
-
-                            # Format the tool completion event as a tool call part
-                            formatted_data = self._format_vercel_data_stream(TOOL_CALL_PART, vercel_tool_result).encode("utf-8")
-                            log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending tool completion event: {formatted_data}")
-                            yield formatted_data
-                            log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sleeping for 0.01 seconds before next event...")
-                            await asyncio.sleep(0.01)
-
-                elif event == RunEvent.run_error and content:
-                    formatted_data = self._format_vercel_data_stream(ERROR_PART, str(content)).encode("utf-8")
-                    log_error(f"[Agno-Vercel Adapter][{self.agent.name}]: Error in run: {formatted_data}")
-                    yield formatted_data
-                    log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sleeping for 0.01 seconds before next event...")
-                    await asyncio.sleep(0.01)
-
-                elif event == RunEvent.run_completed:
-                    finish_data: Dict[str, Any] = {"finishReason": "stop"}
-                    if metrics:
-                        finish_data["usage"] = {
-                            "promptTokens": int(metrics.get("input_tokens", metrics.get("prompt_tokens", 0))),
-                            "completionTokens": int(metrics.get("output_tokens", metrics.get("completion_tokens", 0))),
-                            "totalTokens": int(metrics.get("total_tokens", 0)),
-                        }
-                        if finish_data["usage"]["totalTokens"] == 0:
-                            finish_data["usage"]["totalTokens"] = finish_data["usage"]["promptTokens"] + finish_data["usage"]["completionTokens"]
-                    formatted_data = self._format_vercel_data_stream(FINISH_MESSAGE_PART, finish_data).encode("utf-8")
-                    log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending finish message: {formatted_data}")
-                    yield formatted_data
-                    log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sleeping for 0.01 seconds before next event...")
-                    await asyncio.sleep(0.01)
-
-                elif event == RunEvent.reasoning_step and content: # Example
-                    if isinstance(content, str):
-                        formatted_data = self._format_vercel_data_stream(REASONING_PART, content).encode("utf-8")
-                        log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending reasoning step: {formatted_data}")
+
+                # Text is by far the most frequent event, so it is handled inline
+                if event == run_response_event and content:
+                    # Buffer the text and send it once the chunk is full or has waited long enough
+                    if not text_buf:
+                        text_buf_started = monotonic()
+                    text_buf_append(content if type(content) is str else str(content))
+                    if len(text_buf) >= chunk_size or monotonic() - text_buf_started >= max_delay:
+                        formatted_data = flush_text()
+                        if debug_enabled:
+                            log_debug(f"[Agno-Vercel Adapter][{agent_name}]: Sending text response event: {formatted_data}")
                         yield formatted_data
-                        log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sleeping for 0.01 seconds before next event...")
-                        await asyncio.sleep(0.01)
-
-                elif thinking:
-                    formatted_data = self._format_vercel_data_stream(REASONING_PART, thinking).encode("utf-8")
-                    log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sending thinking: {formatted_data}")
-                    yield formatted_data
-                    log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Sleeping for 0.01 seconds before next event...")
-                    await asyncio.sleep(0.01)
+                    continue
+
+                # A handler returns None when the event carries nothing it handles,
+                # in which case any model thinking on the event is forwarded instead.
+                handler = handlers_get(event)
+                frames = handler(agno_response) if handler else None
+                if frames is None and agno_response.thinking:
+                    formatted_data = fmt(REASONING_PART, agno_response.thinking)
+                    if debug_enabled:
+                        log_debug(f"[Agno-Vercel Adapter][{agent_name}]: Sending thinking: {formatted_data}")
+                    frames = [formatted_data]
+
+                if text_buf:
+                    # Keep ordering: buffered text goes out before any other frame
+                    formatted_data = flush_text()
+                    if debug_enabled:
+                        log_debug(f"[Agno-Vercel Adapter][{agent_name}]: Sending text response event: {formatted_data}")
+                    frames = [formatted_data, *frames] if frames else [formatted_data]
+
+                # All frames produced for one Agno event go out as a single body chunk
+                if frames:
+                    yield frames[0] if len(frames) == 1 else b"".join(frames)
+
+            if text_buf:
+                yield flush_text()
         except Exception as e:
             # Handle ModelProviderError and other exceptions
             import traceback
@@ -387,61 +591,81 @@ class AgnoVercelAdapter:
             error_type = e.__class__.__name__
             stack_trace = traceback.format_exc()
             log_error(f"[Agno-Vercel Adapter][{self.agent.name}]: Error in stream: {error_type} - {error_message}\nStack trace:\n{stack_trace}")
-            
-            # Send a user-friendly message first
-            user_message = "I encountered an issue processing your request. Please feel free to continue our conversation or try rephrasing your question."
-            formatted_message = self._format_vercel_data_stream(TEXT_PART, user_message).encode("utf-8")
-            yield formatted_message
-                        
-            # Send a finish message to properly close the stream
-            finish_data = {"finishReason": "stop"}
-            formatted_finish = self._format_vercel_data_stream(FINISH_MESSAGE_PART, finish_data).encode("utf-8")
-            yield formatted_finish
+
+            # Flush any buffered text, then send a user-friendly message and
+            # a finish message to properly close the stream, as one chunk
+            pending_text = flush_text() if text_buf else b""
+            yield pending_text + _STREAM_ERROR_TEXT_FRAME + _FINISH_STOP_FRAME
 
             # ... map other events as needed ...
 
 
     def _prepare_agno_messages_from_vercel_history(self, messages: List[Dict[str, Any]]):
-        # Convert Vercel message history to Agno's expected format
+        # Convert Vercel message history to Agno's expected format.
+        # The history is the useChat payload from our own frontend and every field is
+        # set here, so messages are built with model_construct (no Pydantic validation).
         agno_messages: List[AgnoMessage] = []
+        new_message = AgnoMessage.model_construct
 
         # Process all messages including the last one's original content
+        # (a message's tool results must follow it, so this stays a single ordered pass)
         for msg_data in messages:
 
             # Create AgnoMessage, handling potential missing fields gracefully
             agno_msg_content = msg_data.get("content")
-            agno_role = msg_data.get("role")
 
             if agno_msg_content:
-                agno_msg = AgnoMessage(
-                    role=agno_role,
-                    content=str(agno_msg_content),
-                )
-                agno_messages.append(agno_msg)
-
-            if "toolInvocations" in msg_data:
-                # Collect all tool results
-                for tool_invocation in msg_data.get("toolInvocations", []):
-                    if tool_invocation.get("state") == "result":
-                        tool_id = tool_invocation.get('toolCallId')
-                        tool_name = tool_invocation.get('toolName')
-                        tool_result = tool_invocation.get("result", {})
-                        if tool_name == self.BACKEND_TOOL_DISPLAY_NAME:
-                            # we dont want to show agent the response from BACKEND_TOOL_DISPLAY_NAME, as that is irrelevant (being internal tool) and should be transparent to agent.
-                            continue
-                        tool_result_message = AgnoMessage(
-                            role="user",
-                            content=f"I am providing you the result of frontend tools:\nTool '{tool_name}' with id '{tool_id}' returned: '{json.dumps(tool_result)}'",
-                        )
-                        agno_messages.append(tool_result_message)
+                agno_messages.append(new_message(
+                    role=msg_data.get("role"),
+                    content=agno_msg_content if type(agno_msg_content) is str else str(agno_msg_content),
+                ))
+
+            # Collect all tool results. Results of BACKEND_TOOL_DISPLAY_NAME are skipped: we dont want to show agent
+            # the response from it, as that is irrelevant (being internal tool) and should be transparent to agent.
+            tool_invocations = msg_data.get("toolInvocations")
+            if tool_invocations:
+                agno_messages.extend([
+                    new_message(
+                        role="user",
+                        content="".join((
+                            "I am providing you the result of frontend tools:\nTool '",
+                            str(tool_invocation.get("toolName")),
+                            "' with id '",
+                            str(tool_invocation.get("toolCallId")),
+                            "' returned: '",
+                            _json_dumps_bytes(tool_invocation.get("result", {})).decode("utf-8"),
+                            "'",
+                        )),
+                    )
+                    for tool_invocation in tool_invocations
+                    if tool_invocation.get("state") == "result"
+                    and tool_invocation.get("toolName") != self.BACKEND_TOOL_DISPLAY_NAME
+                ])
 
         return agno_messages
 
 
+    def _parse_tool_args(self, tool_call_id: Optional[str], raw_args: str) -> Any:
+        """
+        Decodes a tool call's JSON argument string. Agno repeats the tools list on
+        every tool event, so the result is cached per tool call id and reused while
+        the raw string is unchanged. Raises json.JSONDecodeError on invalid JSON.
+        """
+        cached = self._parsed_tool_args.get(tool_call_id)
+        if cached is not None and cached[0] == raw_args:
+            return cached[1]
+        parsed = _json_loads(raw_args)
+        if tool_call_id is not None:
+            self._parsed_tool_args.add(tool_call_id, (raw_args, parsed))
+        return parsed
+
     def _reset_tool_tracking(self):
         """Reset the tool tracking sets to avoid issues between conversations."""
-        self._processed_tool_call_starts = set()
-        self._processed_tool_call_completions = set()
+        # Bounded so a long conversation with many tool calls cannot grow them indefinitely
+        self._processed_tool_call_starts = _RecentIds()
+        self._processed_tool_call_completions = _RecentIds()
+        self._active_proxy_ids = set()
+        self._parsed_tool_args.clear()
         log_debug(f"[Agno-Vercel Adapter][{self.agent.name}]: Reset tool tracking sets")
 
     async def stream_response(
@@ -452,7 +676,9 @@ class AgnoVercelAdapter:
         **kwargs: Any # For other potential args to agent.arun
     ) -> AsyncGenerator[bytes, None]:
         """
-        Runs the Agno agent and yields the response stream formatted for Vercel AI SDK.
+        Starts the Agno agent run and returns its response stream formatted for Vercel AI SDK.
+        The converter generator is handed back as-is rather than re-yielded, so each
+        chunk passes through one generator frame instead of two.
         """
         # Reset tool tracking for new user messages
         if messages and messages[-1].get("role") == "user":
@@ -476,5 +702,4 @@ class AgnoVercelAdapter:
             **kwargs
         )
 
-        async for chunk in self._agno_to_vercel_stream(agno_stream_generator):
-            yield chunk
\ No newline at end of file
+        return self._agno_to_vercel_stream(agno_stream_generator)
\ No newline at end of file
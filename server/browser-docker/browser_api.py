@@ -1,9 +1,12 @@
 import uvicorn
 from fastapi import FastAPI, APIRouter, HTTPException, Body
-from playwright.async_api import async_playwright, Browser, Page, BrowserContext
+from fastapi.responses import JSONResponse
+from playwright.async_api import async_playwright, Browser, Page, BrowserContext, ElementHandle, Playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Collection, Callable, Awaitable
 import asyncio
+from collections import deque
 import json
 import logging
 import base64
@@ -11,13 +14,56 @@ from dataclasses import dataclass, field
 from datetime import datetime
 import os
 import random
-import re 
-from functools import cached_property
-import traceback
+import sys
 import pytesseract
-from PIL import Image
+from PIL import Image, ImageOps
 import io
 
+# Every action result carries a base64 screenshot, so response encoding is on the hot path; orjson encodes it
+# several times faster than the stdlib json encoder behind JSONResponse.
+try:
+    import orjson  # noqa: F401 (required by ORJSONResponse)
+    from fastapi.responses import ORJSONResponse as DefaultResponseClass
+except ImportError:
+    DefaultResponseClass = JSONResponse
+
+# tesserocr keeps one Tesseract instance loaded in-process; without it every OCR call goes through
+# pytesseract, which spawns the tesseract CLI and reloads the model each time.
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# Screenshots are taken at CSS pixel size: on HiDPI displays device scale multiplies the bytes that get
+# encoded, base64'd and OCR'd without adding text that the OCR can read.
+SCREENSHOT_JPEG_QUALITY = 40
+
+# After navigations and input, actions wait for DOMContentLoaded and then give the network a short, bounded
+# chance to go idle. Many pages never reach networkidle (analytics, long polling), so long networkidle waits
+# and fixed sleeps cost seconds per action.
+PAGE_SETTLE_DOMCONTENT_TIMEOUT_MS = 5000
+PAGE_SETTLE_NETWORKIDLE_TIMEOUT_MS = 2000
+# Once an action is known to have started a navigation, how long to wait for the new document to commit
+# before reading state (the DOMContentLoaded wait alone would resolve against the old document).
+NAVIGATION_COMMIT_TIMEOUT_MS = 10000
+# Key presses report nothing back, so after them a navigation (Enter submitting a form) is given this long to start.
+NAVIGATION_DETECT_GRACE_MS = 300
+
+# OCR preprocessing: screenshots are binarized to a 1-bit image before Tesseract sees them.
+# The lookup table maps each grayscale level to black/white, which is cheaper than a per-pixel lambda.
+OCR_BINARIZE_THRESHOLD = 180
+_OCR_BINARIZE_TABLE = [255 if level > OCR_BINARIZE_THRESHOLD else 0 for level in range(256)]
+# LSTM engine, treat the viewport as one uniform block of text (skips full page layout analysis).
+OCR_TESSERACT_CONFIG = "--oem 1 --psm 6"
+# OCR is the most expensive part of a state refresh; by default it is skipped when the interactive elements
+# already expose at least this much text (the page is readable from the DOM listing).
+OCR_SKIP_MIN_DOM_TEXT_CHARS = 200
+
+# Blank pages kept open in the shared context so open_tab doesn't pay for page creation; closed tabs are
+# reset to about:blank and returned to the pool. The pool is refilled in the background. In headful Chromium
+# each pooled page is a real window, so the pool is kept to one and the active tab is raised again after a refill.
+PAGE_POOL_SIZE = 1
+
 #######################################################
 # Action model definitions
 #######################################################
@@ -84,34 +130,34 @@ class DoneAction(BaseModel):
 # DOM Structure Models
 #######################################################
 
-@dataclass
+# Attribute names the page reports are interned in build_selector_map, so lookups with these (interned) literals
+# compare by identity. Tuples keep the order the attributes are listed in.
+_ELEMENT_LINE_ATTRIBUTES = ('id', 'href', 'name', 'value', 'type')
+_ELEMENT_METADATA_ATTRIBUTES = ('id', 'href', 'src', 'alt', 'placeholder', 'name', 'role', 'title', 'type', 'aria-label')
+
+@dataclass(slots=True)
 class CoordinateSet:
     x: int = 0
     y: int = 0
     width: int = 0
     height: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class ViewportInfo:
     width: int = 0
     height: int = 0
     scroll_x: int = 0
     scroll_y: int = 0
 
-@dataclass
-class HashedDomElement:
-    tag_name: str
-    attributes: Dict[str, str]
-    is_visible: bool
-    page_coordinates: Optional[CoordinateSet] = None
-
-@dataclass
+@dataclass(slots=True)
 class DOMBaseNode:
+    NODE_KIND = '' # Class-level tag ('text' / 'element') the tree walks dispatch on instead of isinstance
     is_visible: bool
     parent: Optional['DOMElementNode'] = None
 
-@dataclass
+@dataclass(slots=True)
 class DOMTextNode(DOMBaseNode):
+    NODE_KIND = 'text'
     text: str = field(default="")
     type: str = 'TEXT_NODE'
     
@@ -123,8 +169,9 @@ class DOMTextNode(DOMBaseNode):
             current = current.parent
         return False
 
-@dataclass
+@dataclass(slots=True)
 class DOMElementNode(DOMBaseNode):
+    NODE_KIND = 'element'
     tag_name: str = field(default="")
     xpath: str = field(default="")
     attributes: Dict[str, str] = field(default_factory=dict)
@@ -138,65 +185,83 @@ class DOMElementNode(DOMBaseNode):
     viewport_coordinates: Optional[CoordinateSet] = None
     page_coordinates: Optional[CoordinateSet] = None
     viewport_info: Optional[ViewportInfo] = None
+    _hash_key: Optional[int] = field(default=None, init=False, repr=False, compare=False) # Cache slot for `hash_key`
     
     def __repr__(self) -> str:
-        tag_str = f'<{self.tag_name}'
-        for key, value in self.attributes.items():
-            tag_str += f' {key}="{value}"'
-        tag_str += '>'
+        parts = [f'<{self.tag_name}']
+        parts.extend(f' {key}="{value}"' for key, value in self.attributes.items())
+        parts.append('>')
         
         extras = []
         if self.is_interactive: extras.append('interactive')
         if self.is_top_element: extras.append('top')
         if self.highlight_index is not None: extras.append(f'highlight:{self.highlight_index}')
-        if extras: tag_str += f' [{", ".join(extras)}]'
+        if extras: parts.append(f' [{", ".join(extras)}]')
             
-        return tag_str
+        return ''.join(parts)
     
-    @cached_property
-    def hash(self) -> HashedDomElement:
-        return HashedDomElement(
-            tag_name=self.tag_name, attributes=self.attributes,
-            is_visible=self.is_visible, page_coordinates=self.page_coordinates
-        )
+    @property
+    def hash_key(self) -> int:
+        # Integer identity of tag, attributes, visibility and page position: cheap to compare across
+        # state refreshes and usable as a dict/set key, unlike the node itself (unhashable dict/list fields).
+        if self._hash_key is None:
+            coords = self.page_coordinates
+            self._hash_key = hash((
+                self.tag_name, frozenset(self.attributes.items()), self.is_visible,
+                (coords.x, coords.y, coords.width, coords.height) if coords else None
+            ))
+        return self._hash_key
     
     def get_all_text_till_next_clickable_element(self, max_depth: int = -1) -> str:
         text_parts = []
-        def collect_text(node: DOMBaseNode, current_depth: int) -> None:
-            if max_depth != -1 and current_depth > max_depth: return
-            if isinstance(node, DOMElementNode) and node != self and node.highlight_index is not None: return
-            if isinstance(node, DOMTextNode): text_parts.append(node.text)
-            elif isinstance(node, DOMElementNode):
-                for child in node.children: collect_text(child, current_depth + 1)
-        collect_text(self, 0)
+        stack = [(self, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if max_depth != -1 and depth > max_depth: continue
+            kind = node.NODE_KIND
+            if kind == 'text': text_parts.append(node.text)
+            elif kind == 'element':
+                if node is not self and node.highlight_index is not None: continue
+                stack.extend((child, depth + 1) for child in reversed(node.children))
         return '\n'.join(text_parts).strip()
     
-    def clickable_elements_to_string(self, include_attributes: list[str] | None = None) -> str:
+    def clickable_elements_to_string(self, include_attributes: Collection[str] | None = None) -> str:
+        if include_attributes and not isinstance(include_attributes, (set, frozenset)):
+            include_attributes = frozenset(include_attributes) # Membership is tested once per attribute per element
         formatted_text = []
-        def process_node(node: DOMBaseNode, depth: int) -> None:
-            if isinstance(node, DOMElementNode):
+        highlighted = [] # (slot in formatted_text, node, text parts), formatted once the walk has covered the node's subtree
+        # Each stack entry carries the text parts of its nearest highlighted ancestor (None outside any), so every
+        # text node is visited once instead of once more per highlighted ancestor.
+        stack = [(self, None)]
+        while stack:
+            node, owner_parts = stack.pop()
+            kind = node.NODE_KIND
+            if kind == 'element':
                 if node.highlight_index is not None:
-                    text = node.get_all_text_till_next_clickable_element()
-                    display_attributes = []
-                    if include_attributes:
-                        for key, value in node.attributes.items():
-                            if key in include_attributes and value and value != node.tag_name and not (text and value in text):
-                                display_attributes.append(str(value))
-                    attributes_str = ';'.join(display_attributes)
-                    line = f'[{node.highlight_index}]<{node.tag_name}'
-                    for attr_name in ['id', 'href', 'name', 'value', 'type']:
-                        if attr_name in node.attributes and node.attributes[attr_name]:
-                            line += f' {attr_name}="{node.attributes[attr_name]}"'
-                    if text: line += f'> {text}'
-                    elif attributes_str: line += f'> {attributes_str}'
-                    else: line += f'> {node.tag_name.upper()}'
-                    line += ' </>'
-                    formatted_text.append(line)
-                for child in node.children: process_node(child, depth + 1)
-            elif isinstance(node, DOMTextNode):
-                if not node.has_parent_with_highlight_index() and node.is_visible and node.text and node.text.strip():
-                    formatted_text.append(node.text)
-        process_node(self, 0)
+                    owner_parts = []
+                    highlighted.append((len(formatted_text), node, owner_parts))
+                    formatted_text.append(None)
+                stack.extend((child, owner_parts) for child in reversed(node.children))
+            elif kind == 'text':
+                if owner_parts is not None: owner_parts.append(node.text)
+                elif node.is_visible and node.text and node.text.strip(): formatted_text.append(node.text)
+        for slot, node, text_parts in highlighted:
+            text = '\n'.join(text_parts).strip()
+            display_attributes = []
+            if include_attributes:
+                for key, value in node.attributes.items():
+                    if key in include_attributes and value and value != node.tag_name and not (text and value in text):
+                        display_attributes.append(str(value))
+            attributes_str = ';'.join(display_attributes)
+            line = [f'[{node.highlight_index}]<{node.tag_name}']
+            for attr_name in _ELEMENT_LINE_ATTRIBUTES:
+                if attr_name in node.attributes and node.attributes[attr_name]:
+                    line.append(f' {attr_name}="{node.attributes[attr_name]}"')
+            if text: line.append(f'> {text}')
+            elif attributes_str: line.append(f'> {attributes_str}')
+            else: line.append(f'> {node.tag_name.upper()}')
+            line.append(' </>')
+            formatted_text[slot] = ''.join(line)
         result_str = '\n'.join(formatted_text)
         return result_str if result_str.strip() else "No interactive elements found"
 
@@ -208,6 +273,8 @@ class DOMState:
     title: str = ""
     pixels_above: int = 0
     pixels_below: int = 0
+    viewport_width: int = 0
+    viewport_height: int = 0
 
 class BrowserActionResult(BaseModel):
     success: bool = True
@@ -227,19 +294,151 @@ class BrowserActionResult(BaseModel):
     viewport_height: Optional[int] = None
     class Config: arbitrary_types_allowed = True
 
+#######################################################
+# Page state collection
+#######################################################
+
+# Defines window.__agnoCollectState, which returns everything a state refresh needs from the page in one
+# evaluate: visible interactive elements, scroll position, viewport size and title. It is registered as a
+# context init script so each document compiles it once; state refreshes then only evaluate a short call.
+COLLECT_STATE_BOOTSTRAP_JS = """
+// Document version for the state cache: bumped by any DOM mutation other than the collector's own index tags,
+// and by input/change events (typed values are properties, which mutation records don't cover).
+if (!window.__agnoDomObserver) {
+    window.__agnoDomVersion = 0;
+    window.__agnoDocToken = Math.random().toString(36).slice(2);
+    window.__agnoCountMutations = records => {
+        for (const r of records) {
+            if (r.attributeName !== 'data-browser-idx') { window.__agnoDomVersion++; return; }
+        }
+    };
+    const bump = () => { window.__agnoDomVersion++; };
+    window.__agnoDomObserver = new MutationObserver(window.__agnoCountMutations);
+    window.__agnoDomObserver.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    document.addEventListener('input', bump, true);
+    document.addEventListener('change', bump, true);
+}
+window.__agnoCollectState = (knownKey) => {
+    function getAttributes(el) {
+        const attributes = {};
+        for (const attr of el.attributes) attributes[attr.name] = attr.value;
+        return attributes;
+    }
+    const scrollX = window.scrollX, scrollY = window.scrollY || window.pageYOffset;
+    const viewportWidth = window.innerWidth, viewportHeight = window.innerHeight;
+    // Records not yet delivered to the observer are counted now, so the key reflects every change so far.
+    window.__agnoCountMutations(window.__agnoDomObserver.takeRecords());
+    // scrollHeight stands in for layout-only changes that produce no mutation records (images loading, fonts, transitions).
+    const stateKey = [window.__agnoDocToken, window.__agnoDomVersion, location.href, scrollX, scrollY, viewportWidth, viewportHeight,
+                      document.documentElement.scrollHeight].join('|');
+    if (knownKey === stateKey) return {unchanged: true};
+    const interactiveSelector = 'a, button, input:not([type="hidden"]), select, textarea, [role="button"], [role="link"], [role="checkbox"], [role="radio"], [tabindex]:not([tabindex="-1"])';
+    // One document-order walk (same order as querySelectorAll) that prunes display:none subtrees outright:
+    // nothing inside them has a layout box, so none of their descendants could pass the visibility checks.
+    // offsetParent is only null for such elements, fixed-position ones and <body>, so getComputedStyle is rarely needed here.
+    const walker = document.createTreeWalker(document.documentElement, NodeFilter.SHOW_ELEMENT, {
+        acceptNode(node) {
+            if (node.offsetParent === null && window.getComputedStyle(node).display === 'none') return NodeFilter.FILTER_REJECT;
+            return node.matches(interactiveSelector) ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_SKIP;
+        }
+    });
+    // Per element the layout box is read first (cheapest rejection) and the computed style only for elements
+    // that have one, each read once.
+    // Each listed element is tagged with its index (ELEMENT_INDEX_ATTRIBUTE) so actions can address it with a
+    // plain attribute selector; tags from the previous snapshot are cleared first so indices never go stale.
+    for (const el of document.querySelectorAll('[data-browser-idx]')) el.removeAttribute('data-browser-idx');
+    const elements = [];
+    for (let el = walker.nextNode(); el; el = walker.nextNode()) {
+        const rect = el.getBoundingClientRect();
+        if (rect.width <= 0 || rect.height <= 0 || el.offsetParent === null) continue;
+        const style = window.getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') continue;
+        const left = Math.round(rect.left), top = Math.round(rect.top), width = Math.round(rect.width), height = Math.round(rect.height);
+        elements.push({
+            index: elements.length + 1, tagName: el.tagName.toLowerCase(), text: el.innerText || el.value || el.getAttribute('aria-label') || '',
+            attributes: getAttributes(el), isVisible: true, isInteractive: true,
+            pageCoordinates: { x: Math.round(rect.left+scrollX), y: Math.round(rect.top+scrollY), width, height },
+            viewportCoordinates: { x: left, y: top, width, height },
+            isInViewport: rect.top>=0 && rect.left>=0 && rect.bottom<=viewportHeight && rect.right<=viewportWidth
+        });
+        el.setAttribute('data-browser-idx', elements.length);
+    }
+    const body=document.body, html=document.documentElement;
+    const totalHeight = Math.max(body ? body.scrollHeight : 0, body ? body.offsetHeight : 0, html.clientHeight, html.scrollHeight, html.offsetHeight);
+    return {
+        elements,
+        scrollInfo: { pixelsAbove:Math.round(scrollY), pixelsBelow:Math.round(Math.max(0,totalHeight-scrollY-viewportHeight)), totalHeight:Math.round(totalHeight), viewportHeight:Math.round(viewportHeight) },
+        viewport: { width: viewportWidth, height: viewportHeight },
+        title: document.title,
+        stateKey,
+    };
+};
+"""
+# Attribute the collector stamps on every listed element, holding its (1-based) highlight index.
+ELEMENT_INDEX_ATTRIBUTE = "data-browser-idx"
+# Called with the key of the cached state; the collector answers {unchanged: true} instead of re-collecting if it still matches.
+COLLECT_STATE_CALL_JS = "(knownKey) => window.__agnoCollectState ? window.__agnoCollectState(knownKey) : null"
+# For documents loaded before the init script was registered: define the collector there, then call it.
+COLLECT_STATE_FALLBACK_JS = COLLECT_STATE_BOOTSTRAP_JS + "window.__agnoCollectState();"
+
+# Single-round-trip actions on an indexed element: look it up, scroll it into view and act on it in-page.
+CLICK_INDEXED_ELEMENT_JS = """
+async (idx) => {
+    const el = document.querySelector(`[data-browser-idx="${idx}"]`);
+    if (!el) return {found: false, navigationStarted: false};
+    el.scrollIntoView({block: 'center', inline: 'center', behavior: 'instant'});
+    const hrefBefore = location.href;
+    let unloading = false;
+    const onUnload = () => { unloading = true; };
+    window.addEventListener('beforeunload', onUnload);
+    window.addEventListener('pagehide', onUnload);
+    el.click();
+    // Link and form navigations are scheduled by click(), not started by it; give them a moment to begin.
+    await new Promise(resolve => setTimeout(resolve, 50));
+    window.removeEventListener('beforeunload', onUnload);
+    window.removeEventListener('pagehide', onUnload);
+    return {found: true, navigationStarted: unloading || location.href !== hrefBefore};
+}
+"""
+# Plain <input>/<textarea> values go through the prototype's setter so frameworks tracking the property (React)
+# see the change. Anything else (contentEditable rich editors) is reported as not handled and filled by Playwright.
+INPUT_INDEXED_ELEMENT_JS = """
+([idx, text]) => {
+    const el = document.querySelector(`[data-browser-idx="${idx}"]`);
+    if (!el) return {found: false, handled: false};
+    const proto = el instanceof HTMLInputElement ? HTMLInputElement.prototype
+        : el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : null;
+    if (!proto) return {found: true, handled: false};
+    el.scrollIntoView({block: 'center', inline: 'center', behavior: 'instant'});
+    el.focus();
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, text);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    return {found: true, handled: true};
+}
+"""
+
 class BrowserAutomation:
     def __init__(self):
         self.router = APIRouter()
+        # One Playwright driver for the whole app lifetime; browser restarts relaunch through it.
+        self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.pages: List[Page] = []
         self.current_page_index: int = 0
+        self._dom_state_cache: Optional[Tuple[Page, str, DOMState]] = None # (page, collector state key, state)
+        self._page_pool: deque[Page] = deque()
+        self._page_pool_refill: Optional[asyncio.Task] = None
         self.logger = logging.getLogger("browser_automation_agno")
         if not self.logger.hasHandlers():
             logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        self.include_attributes = ["id", "href", "src", "alt", "aria-label", "placeholder", "name", "role", "title", "value"]
+        self.include_attributes = frozenset(["id", "href", "src", "alt", "aria-label", "placeholder", "name", "role", "title", "value"])
         self.screenshot_dir = os.path.join(os.getcwd(), "agno_screenshots")
         os.makedirs(self.screenshot_dir, exist_ok=True)
+        self._tess_api = None
+        self._ocr_lock = asyncio.Lock() # The Tesseract API object is not safe for concurrent use
+        self._startup_lock = asyncio.Lock() # Concurrent requests that find the browser gone restart it only once
         
         self._register_routes()
 
@@ -277,8 +476,13 @@ class BrowserAutomation:
             else:
                 self.logger.info(f"Using existing DISPLAY environment variable: {current_display}")
 
-            playwright = await async_playwright().start()
-            self.logger.info("Playwright started, launching browser...")
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+                self.logger.info("Playwright started.")
+            self.logger.info("Launching browser...")
+            self.pages = [] # Pages of a previous (disconnected) browser are not reusable
+            self._dom_state_cache = None
+            self._page_pool.clear()
             
             default_args = [
                 '--no-sandbox', '--disable-setuid-sandbox', '--disable-infobars',
@@ -303,13 +507,13 @@ class BrowserAutomation:
             }
             
             try:
-                self.browser = await playwright.chromium.launch(**launch_options)
+                self.browser = await self.playwright.chromium.launch(**launch_options)
                 self.logger.info("Browser launched successfully (headful mode with anti-detection args).")
             except Exception as browser_error:
                 self.logger.error(f"Failed to launch browser with anti-detection args: {browser_error}", exc_info=True)
                 self.logger.info("Retrying with minimal headful options (still passing DISPLAY)...")
                 minimal_launch_options = {"timeout": 120000, "headless": False, "env": {**os.environ}} 
-                self.browser = await playwright.chromium.launch(**minimal_launch_options)
+                self.browser = await self.playwright.chromium.launch(**minimal_launch_options)
                 self.logger.info("Browser launched with minimal options (headful mode).")
 
             if self.browser.contexts:
@@ -323,6 +527,8 @@ class BrowserAutomation:
                     java_script_enabled=True, accept_downloads=True,
                 )
                 self.logger.info("New browser context created.")
+            # Registered before pages are opened so every document (and each new tab) gets the state collector
+            await self.context.add_init_script(COLLECT_STATE_BOOTSTRAP_JS)
             
             if self.context.pages:
                 self.pages = self.context.pages
@@ -342,25 +548,90 @@ class BrowserAutomation:
                 self.current_page_index = 0
                 await page.goto("https://www.google.com", wait_until="domcontentloaded", timeout=60000)
                 self.logger.info("Navigated new page to google.com")
-                
+
+            if tesserocr is not None and self._tess_api is None:
+                try:
+                    self._tess_api = tesserocr.PyTessBaseAPI(lang='eng', oem=tesserocr.OEM.LSTM_ONLY, psm=tesserocr.PSM.SINGLE_BLOCK)
+                    self.logger.info("Persistent Tesseract API initialized for OCR.")
+                except Exception as ocr_error:
+                    self.logger.warning(f"Could not initialize tesserocr, falling back to pytesseract: {ocr_error}")
+
+            self._schedule_page_pool_refill()
             self.logger.info("Browser initialization completed successfully.")
         except Exception as e:
             self.logger.error(f"Browser startup error: {str(e)}", exc_info=True)
             raise RuntimeError(f"Browser initialization failed: {str(e)}")
             
     async def shutdown(self):
+        if self._page_pool_refill is not None and not self._page_pool_refill.done():
+            self._page_pool_refill.cancel()
+        self._page_pool.clear()
         if self.browser:
             await self.browser.close()
             self.logger.info("Browser closed successfully.")
+        if self._tess_api is not None:
+            async with self._ocr_lock: # Let an in-flight OCR call finish before releasing the API
+                self._tess_api.End()
+                self._tess_api = None
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
         self.browser = None
         self.context = None
         self.pages = []
         self.current_page_index = 0
+
+    def _schedule_page_pool_refill(self):
+        if self._page_pool_refill is None or self._page_pool_refill.done():
+            self._page_pool_refill = asyncio.create_task(self._refill_page_pool())
+
+    async def _refill_page_pool(self):
+        added = False
+        try:
+            while self.context is not None and len(self._page_pool) < PAGE_POOL_SIZE:
+                self._page_pool.append(await self.context.new_page())
+                added = True
+        except Exception as e:
+            self.logger.warning(f"Could not refill the page pool: {e}")
+        if added and 0 <= self.current_page_index < len(self.pages):
+            current_page = self.pages[self.current_page_index]
+            try:
+                if not current_page.is_closed(): await current_page.bring_to_front() # New pages open on top of it
+            except Exception as e:
+                self.logger.debug(f"Could not raise the current page after refilling the pool: {e}")
+
+    async def acquire_page(self) -> Page:
+        """Returns a blank page from the pool, or a new one if the pool is empty."""
+        page = None
+        while self._page_pool:
+            candidate = self._page_pool.popleft()
+            if not candidate.is_closed():
+                page = candidate
+                break
+        if page is None:
+            if not self.context: raise Exception("Browser context unavailable to create new tab.")
+            page = await self.context.new_page()
+        self._schedule_page_pool_refill()
+        return page
+
+    async def release_page(self, page: Page):
+        """Resets a closed tab's page to about:blank and returns it to the pool, or closes it if the pool is full."""
+        if page.is_closed(): return
+        if len(self._page_pool) < PAGE_POOL_SIZE:
+            try:
+                await page.goto("about:blank", timeout=5000)
+                self._page_pool.append(page)
+                return
+            except Exception as e:
+                self.logger.warning(f"Could not reset page for reuse, closing it: {e}")
+        await page.close()
     
     async def get_current_page(self) -> Page:
         if not self.browser or not self.browser.is_connected():
-            self.logger.error("Browser is not connected or not initialized. Attempting to restart.")
-            await self.startup() 
+            async with self._startup_lock:
+                if not self.browser or not self.browser.is_connected(): # May have been restarted while waiting for the lock
+                    self.logger.error("Browser is not connected or not initialized. Attempting to restart.")
+                    await self.startup() 
             if not self.pages:
                  self.logger.error("Failed to recover browser pages after restart attempt.")
                  raise HTTPException(status_code=503, detail="Browser service unavailable after restart attempt.")
@@ -368,15 +639,14 @@ class BrowserAutomation:
         if not self.pages or self.current_page_index >= len(self.pages) or self.pages[self.current_page_index].is_closed():
             self.logger.warning(f"Current page (index {self.current_page_index}, total {len(self.pages)}) is invalid or closed. Opening/activating new page.")
             if self.context:
-                open_pages = [p for p in self.context.pages if not p.is_closed()]
+                open_pages = [p for p in self.context.pages if not p.is_closed() and p not in self._page_pool]
                 if open_pages:
                     self.pages = open_pages
                     self.current_page_index = 0 
                     await self.pages[self.current_page_index].bring_to_front()
                     self.logger.info(f"Switched to existing open page at index {self.current_page_index}, URL: {self.pages[self.current_page_index].url}")
                 else:
-                    page = await self.context.new_page()
-                    await page.goto("about:blank", wait_until="domcontentloaded", timeout=30000)
+                    page = await self.acquire_page()
                     self.pages = [page] 
                     self.current_page_index = 0
                     self.logger.info(f"All pages were closed. New page created and set as current (index {self.current_page_index}).")
@@ -386,45 +656,16 @@ class BrowserAutomation:
         
         return self.pages[self.current_page_index]
 
-    async def get_selector_map(self) -> Dict[int, DOMElementNode]:
-        page = await self.get_current_page()
+    def build_selector_map(self, elements_data: List[Dict[str, Any]]) -> Tuple[DOMElementNode, Dict[int, DOMElementNode]]:
+        root = DOMElementNode(is_visible=True, tag_name="body", is_interactive=False, is_top_element=True)
         selector_map = {}
         try:
-            elements_js = """
-            (() => {
-                function getAttributes(el) {
-                    const attributes = {};
-                    for (const attr of el.attributes) attributes[attr.name] = attr.value;
-                    return attributes;
-                }
-                const interactiveElements = Array.from(document.querySelectorAll(
-                    'a, button, input:not([type="hidden"]), select, textarea, [role="button"], [role="link"], [role="checkbox"], [role="radio"], [tabindex]:not([tabindex="-1"])'
-                ));
-                const visibleElements = interactiveElements.filter(el => {
-                    const style = window.getComputedStyle(el);
-                    const rect = el.getBoundingClientRect();
-                    return style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0' && rect.width > 0 && rect.height > 0 && el.offsetParent !== null;
-                });
-                return visibleElements.map((el, index) => {
-                    const rect = el.getBoundingClientRect();
-                    return {
-                        index: index + 1, tagName: el.tagName.toLowerCase(), text: el.innerText || el.value || el.getAttribute('aria-label') || '',
-                        attributes: getAttributes(el), isVisible: true, isInteractive: true,
-                        pageCoordinates: { x: Math.round(rect.left+window.scrollX), y: Math.round(rect.top+window.scrollY), width: Math.round(rect.width), height: Math.round(rect.height) },
-                        viewportCoordinates: { x: Math.round(rect.left), y: Math.round(rect.top), width: Math.round(rect.width), height: Math.round(rect.height) },
-                        isInViewport: rect.top>=0 && rect.left>=0 && rect.bottom<=window.innerHeight && rect.right<=window.innerWidth
-                    };
-                });
-            })();
-            """
-            elements_data = await page.evaluate(elements_js)
-            root = DOMElementNode(is_visible=True, tag_name="body", is_interactive=False, is_top_element=True)
             for idx, el_data in enumerate(elements_data):
                 page_coords = el_data.get('pageCoordinates', {})
                 vp_coords = el_data.get('viewportCoordinates', {})
                 element_node = DOMElementNode(
-                    is_visible=el_data.get('isVisible', True), tag_name=el_data.get('tagName', 'div'),
-                    attributes=el_data.get('attributes', {}), is_interactive=el_data.get('isInteractive', True),
+                    is_visible=el_data.get('isVisible', True), tag_name=sys.intern(el_data.get('tagName', 'div')),
+                    attributes={sys.intern(k): v for k, v in el_data.get('attributes', {}).items()}, is_interactive=el_data.get('isInteractive', True),
                     is_in_viewport=el_data.get('isInViewport', False), highlight_index=el_data.get('index', idx + 1),
                     page_coordinates=CoordinateSet(**page_coords), viewport_coordinates=CoordinateSet(**vp_coords)
                 )
@@ -435,35 +676,34 @@ class BrowserAutomation:
                 selector_map[el_data.get('index', idx + 1)] = element_node
                 root.children.append(element_node); element_node.parent = root
         except Exception as e:
-            self.logger.error(f"Error getting selector map: {e}", exc_info=True);
+            self.logger.error(f"Error building selector map: {e}", exc_info=True);
             dummy = DOMElementNode(is_visible=True,tag_name="a",attributes={'href':'#'},is_interactive=True,highlight_index=1)
             dummy_text = DOMTextNode(is_visible=True, text="Fallback Element"); dummy_text.parent = dummy; dummy.children.append(dummy_text)
             selector_map[1] = dummy
-        return selector_map
+            root.children = [dummy]; dummy.parent = root
+        return root, selector_map
     
     async def get_current_dom_state(self) -> DOMState:
         page = await self.get_current_page() 
         try:
-            selector_map = await self.get_selector_map()
-            root = DOMElementNode(is_visible=True, tag_name="body", is_interactive=False, is_top_element=True)
-            for element in selector_map.values():
-                if element.parent is None: element.parent = root; root.children.append(element)
-            url = page.url; title = "Unknown Title"
-            try: title = await page.title() or "No Title"
-            except Exception as title_err: self.logger.warning(f"Could not get page title: {title_err}")
-            pixels_above = 0; pixels_below = 0
+            state = {}
+            cached = self._dom_state_cache if self._dom_state_cache and self._dom_state_cache[0] is page else None
             try:
-                scroll_info = await page.evaluate("""
-                () => {
-                    const body=document.body, html=document.documentElement;
-                    const totalHeight = Math.max(body.scrollHeight,body.offsetHeight,html.clientHeight,html.scrollHeight,html.offsetHeight);
-                    const scrollY = window.scrollY || window.pageYOffset;
-                    const windowHeight = window.innerHeight;
-                    return { pixelsAbove:Math.round(scrollY), pixelsBelow:Math.round(Math.max(0,totalHeight-scrollY-windowHeight)), totalHeight:Math.round(totalHeight), viewportHeight:Math.round(windowHeight) };
-                }""")
-                pixels_above = scroll_info.get('pixelsAbove',0); pixels_below = scroll_info.get('pixelsBelow',0)
-            except Exception as e: self.logger.warning(f"Error getting scroll info: {e}")
-            return DOMState(element_tree=root, selector_map=selector_map, url=url, title=title, pixels_above=pixels_above, pixels_below=pixels_below)
+                state = await page.evaluate(COLLECT_STATE_CALL_JS, cached[1] if cached else None)
+                if state is None: state = await page.evaluate(COLLECT_STATE_FALLBACK_JS)
+                state = state or {}
+            except Exception as e: self.logger.error(f"Error collecting page state: {e}", exc_info=True)
+            if cached and state.get('unchanged'):
+                return cached[2]
+            # A missing element list (failed evaluate) falls through to the fallback element in build_selector_map.
+            root, selector_map = self.build_selector_map(state.get('elements'))
+            scroll_info = state.get('scrollInfo') or {}; viewport = state.get('viewport') or {}
+            title = (state.get('title') or "No Title") if state else "Unknown Title"
+            dom_state = DOMState(element_tree=root, selector_map=selector_map, url=page.url, title=title,
+                            pixels_above=scroll_info.get('pixelsAbove',0), pixels_below=scroll_info.get('pixelsBelow',0),
+                            viewport_width=viewport.get('width',0), viewport_height=viewport.get('height',0))
+            self._dom_state_cache = (page, state['stateKey'], dom_state) if state.get('stateKey') else None
+            return dom_state
         except Exception as e:
             self.logger.error(f"Error getting DOM state: {e}", exc_info=True);
             dummy_root = DOMElementNode(is_visible=True,tag_name="body",is_interactive=False,is_top_element=True)
@@ -473,15 +713,60 @@ class BrowserAutomation:
             except: pass
             return DOMState(element_tree=dummy_root, selector_map=dummy_map, url=current_url, title="Error page", pixels_above=0, pixels_below=0)
 
-    async def take_screenshot(self) -> str:
+    async def run_and_follow_navigation(self, page: Page, action: Callable[[], Awaitable[Any]], detect_grace_ms: int = 0) -> Tuple[Any, bool]:
+        """
+        Runs an action and, if it started a main-frame navigation, waits for the new document to commit so that
+        state read afterwards does not come from the page being navigated away from. A navigation is detected from
+        a main-frame navigation request or commit seen while the action runs (or within detect_grace_ms after it),
+        or from the action returning {"navigationStarted": True}.
+        Returns the action's result (None if the navigation destroyed its execution context) and whether it navigated.
+        """
+        started = asyncio.Event(); committed = asyncio.Event()
+        def on_request(request):
+            if request.is_navigation_request() and request.frame == page.main_frame: started.set()
+        def on_frame_navigated(frame):
+            if frame == page.main_frame: committed.set()
+        page.on("request", on_request); page.on("framenavigated", on_frame_navigated)
+        try:
+            result = None
+            try:
+                result = await action()
+                if isinstance(result, dict) and result.get("navigationStarted"): started.set()
+            except Exception as e:
+                if "Execution context was destroyed" not in str(e): raise
+                started.set() # The navigation committed while the action was still running
+            if detect_grace_ms and not (started.is_set() or committed.is_set()):
+                try: await asyncio.wait_for(started.wait(), detect_grace_ms / 1000)
+                except asyncio.TimeoutError: pass
+            if started.is_set() and not committed.is_set():
+                try: await asyncio.wait_for(committed.wait(), NAVIGATION_COMMIT_TIMEOUT_MS / 1000)
+                except asyncio.TimeoutError: self.logger.warning("Navigation started by the action did not commit in time, reading current state.")
+            navigated = started.is_set() or committed.is_set()
+            if navigated: # Until the new document commits its key still matches the cached state of the old one
+                self._dom_state_cache = None
+            return result, navigated
+        finally:
+            page.remove_listener("request", on_request); page.remove_listener("framenavigated", on_frame_navigated)
+
+    async def wait_for_page_settle(self, page: Page, wait_for_network_idle: bool = True) -> None:
+        # Only meaningful once any navigation the action started has committed (see run_and_follow_navigation):
+        # before that, DOMContentLoaded is already satisfied by the old document. Clicks and key presses that
+        # navigate skip the networkidle wait, since DOMContentLoaded is the point at which the new page can be read.
+        try:
+            await page.wait_for_load_state("domcontentloaded", timeout=PAGE_SETTLE_DOMCONTENT_TIMEOUT_MS)
+            if wait_for_network_idle:
+                await page.wait_for_load_state("networkidle", timeout=PAGE_SETTLE_NETWORKIDLE_TIMEOUT_MS)
+        except Exception as e:
+            self.logger.debug(f"Page did not settle within the wait budget, continuing: {e}")
+
+    async def take_screenshot(self) -> bytes:
+        # Raw JPEG bytes: OCR reads them directly and build_action_result base64-encodes them once for the response.
         try:
             page = await self.get_current_page()
-            await page.wait_for_timeout(250) 
-            screenshot_bytes = await page.screenshot(type='jpeg', quality=75, full_page=False, timeout=30000, scale='device') 
-            return base64.b64encode(screenshot_bytes).decode('utf-8')
+            return await page.screenshot(type='jpeg', quality=SCREENSHOT_JPEG_QUALITY, full_page=False, timeout=30000, scale='css') 
         except Exception as e:
             self.logger.error(f"Error taking screenshot: {e}", exc_info=True);
-            return ""
+            return b""
 
     async def save_screenshot_to_file(self) -> str:
         try:
@@ -495,52 +780,77 @@ class BrowserAutomation:
             self.logger.error(f"Error saving screenshot: {e}", exc_info=True)
             return ""
 
-    async def extract_ocr_text_from_screenshot(self, screenshot_base64: str) -> str:
-        if not screenshot_base64: return ""
+    @staticmethod
+    def _write_file_sync(path: str, data: bytes):
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def _run_ocr_sync(self, screenshot_bytes: bytes, tess_api=None) -> str:
+        image = Image.open(io.BytesIO(screenshot_bytes))
+        image = ImageOps.autocontrast(image.convert('L')).point(_OCR_BINARIZE_TABLE, '1')
+        if tess_api is not None:
+            tess_api.SetImage(image)
+            return tess_api.GetUTF8Text()
+        return pytesseract.image_to_string(image, config=OCR_TESSERACT_CONFIG)
+
+    async def extract_ocr_text_from_screenshot(self, screenshot_bytes: bytes) -> str:
+        if not screenshot_bytes: return ""
         try:
-            image_bytes = base64.b64decode(screenshot_base64); image = Image.open(io.BytesIO(image_bytes))
-            ocr_text = pytesseract.image_to_string(image); 
+            # Decoding and Tesseract are CPU-bound, so they run in a worker thread to keep the Playwright loop responsive.
+            if self._tess_api is not None:
+                async with self._ocr_lock:
+                    ocr_text = await asyncio.to_thread(self._run_ocr_sync, screenshot_bytes, self._tess_api)
+            else:
+                ocr_text = await asyncio.to_thread(self._run_ocr_sync, screenshot_bytes)
             self.logger.info(f"OCR extracted {len(ocr_text)} chars.")
             return ocr_text.strip()
         except Exception as e:
             self.logger.error(f"Error performing OCR: {e}", exc_info=True);
             return ""
 
-    async def get_updated_browser_state(self, action_name: str) -> tuple:
+    async def get_updated_browser_state(self, action_name: str, screenshot: bool = True, ocr: Optional[bool] = None) -> tuple:
+        # screenshot=False skips the screenshot and OCR for actions that leave the page as it was in the previous result.
+        # ocr=None runs OCR only when the interactive elements carry little text; True/False force it on/off.
         try:
-            await asyncio.sleep(0.35) 
-            dom_state = await self.get_current_dom_state(); screenshot = await self.take_screenshot()
-            elements = dom_state.element_tree.clickable_elements_to_string(include_attributes=self.include_attributes)
-            page = await self.get_current_page(); metadata = {}
+            await self.get_current_page() # Recover the page once here rather than in both concurrent calls below
+            if screenshot:
+                # DOM state collection and the screenshot are independent round-trips to the browser, so they overlap.
+                dom_state, screenshot_bytes = await asyncio.gather(self.get_current_dom_state(), self.take_screenshot())
+            else:
+                dom_state, screenshot_bytes = await self.get_current_dom_state(), b""
+            metadata = {}
             metadata['element_count'] = len(dom_state.selector_map)
-            interactive_elements = []
+            interactive_elements = []; dom_text_chars = 0
             for idx, element in dom_state.selector_map.items():
                 el_info={'index':idx,'tag_name':element.tag_name,'text':element.get_all_text_till_next_clickable_element(max_depth=2)[:100],'is_in_viewport':element.is_in_viewport} 
-                for attr in ['id','href','src','alt','placeholder','name','role','title','type','aria-label']: 
+                dom_text_chars += len(el_info['text'])
+                for attr in _ELEMENT_METADATA_ATTRIBUTES: 
                     if attr in element.attributes and element.attributes[attr]: el_info[attr] = str(element.attributes[attr])[:50] 
                 interactive_elements.append(el_info)
             metadata['interactive_elements'] = interactive_elements
-            try:
-                vp = await page.evaluate("() => {{ return {{ width: window.innerWidth, height: window.innerHeight }}; }}")
-                metadata['viewport_width'] = vp.get('width',0); metadata['viewport_height'] = vp.get('height',0)
-            except Exception as e: self.logger.warning(f"Error getting viewport: {e}"); metadata['viewport_width']=0; metadata['viewport_height']=0
-            ocr_text = await self.extract_ocr_text_from_screenshot(screenshot) if screenshot else ""
+            if ocr is None: ocr = dom_text_chars < OCR_SKIP_MIN_DOM_TEXT_CHARS
+            # OCR runs in a worker thread while the element listing is built below.
+            ocr_task = asyncio.create_task(self.extract_ocr_text_from_screenshot(screenshot_bytes)) if ocr and screenshot_bytes else None
+            elements = dom_state.element_tree.clickable_elements_to_string(include_attributes=self.include_attributes)
+            metadata['viewport_width'] = dom_state.viewport_width; metadata['viewport_height'] = dom_state.viewport_height
+            ocr_text = await ocr_task if ocr_task else ""
             metadata['ocr_text'] = ocr_text[:1000] 
             self.logger.info(f"Updated state after {action_name}: {len(dom_state.selector_map)} elements, URL: {dom_state.url if dom_state else 'N/A'}")
-            return dom_state, screenshot, elements, metadata
+            return dom_state, screenshot_bytes, elements, metadata
         except Exception as e:
             self.logger.error(f"Error getting updated state after {action_name}: {e}", exc_info=True);
-            return None, "", "", {}
+            return None, b"", "", {}
 
-    def build_action_result(self, success: bool, message: str, dom_state: Optional[DOMState], screenshot: str, 
+    def build_action_result(self, success: bool, message: str, dom_state: Optional[DOMState], screenshot: bytes, 
                               elements: str, metadata: dict, error: str = "", content: str = None,
                               fallback_url: Optional[str] = None) -> BrowserActionResult:
         if elements is None: elements = ""
+        screenshot_base64 = base64.b64encode(screenshot).decode('ascii') if screenshot else ""
         return BrowserActionResult(
             success=success, message=message, error=error,
             url=dom_state.url if dom_state else fallback_url or "unknown_url", 
             title=dom_state.title if dom_state else "Unknown Title",
-            elements=elements, screenshot_base64=screenshot,
+            elements=elements, screenshot_base64=screenshot_base64,
             pixels_above=dom_state.pixels_above if dom_state else 0, 
             pixels_below=dom_state.pixels_below if dom_state else 0,
             content=content, ocr_text=metadata.get('ocr_text',""), 
@@ -550,96 +860,84 @@ class BrowserAutomation:
             viewport_height=metadata.get('viewport_height',0)
         )
 
+    async def build_error_result(self, error: Exception, log_message: str, recovery_action_name: str, page: Optional[Page]) -> BrowserActionResult:
+        # The traceback is only formatted when DEBUG is enabled; the error itself is always logged.
+        self.logger.error(log_message)
+        self.logger.debug(f"Traceback for: {log_message}", exc_info=error)
+        # The recovery state skips the screenshot and OCR: the failed action's result only needs to say where the page is.
+        dom_state, sc, el, md = await self.get_updated_browser_state(recovery_action_name, screenshot=False)
+        current_url = "unknown"
+        try:
+            if page: current_url = page.url
+        except Exception: pass
+        return self.build_action_result(False, str(error), dom_state, sc, el, md, error=str(error), fallback_url=current_url)
+
+    async def get_element_handle(self, page: Page, index: int) -> Optional[ElementHandle]:
+        # Elements were tagged with their index by the state collector in the get_current_dom_state call preceding this.
+        return await page.query_selector(f'[{ELEMENT_INDEX_ATTRIBUTE}="{int(index)}"]')
+
     async def navigate_to(self, action: GoToUrlAction = Body(...)):
         page = await self.get_current_page() 
         try:
             self.logger.info(f"Navigating to URL: {action.url}")
-            response = await page.goto(action.url, wait_until="load", timeout=30000) 
+            response = await page.goto(action.url, wait_until="domcontentloaded", timeout=30000) 
             if response and not response.ok:
                  self.logger.warning(f"Navigation to {action.url} resulted in HTTP status {response.status}")
-            await asyncio.sleep(2) 
+            await self.wait_for_page_settle(page)
             dom_state, screenshot, elements, metadata = await self.get_updated_browser_state(f"navigate_to({action.url})")
             result = self.build_action_result(True, f"Navigated to {action.url}", dom_state, screenshot, elements, metadata)
             self.logger.info(f"Navigation result: success={result.success}, url={result.url}, title='{result.title}'")
             return result
         except Exception as e:
-            self.logger.error(f"Navigation error to {action.url}: {str(e)}", exc_info=True);
-            dom_state, screenshot, elements, metadata = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, screenshot, elements, metadata = await self.get_updated_browser_state("navigate_error_recovery")
-                if page: current_url = page.url 
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, screenshot, elements, metadata, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Navigation error to {action.url}: {str(e)}", "navigate_error_recovery", page)
 
     async def search_google(self, action: SearchGoogleAction = Body(...)):
         page = await self.get_current_page()
         try:
             search_url = f"https://www.google.com/search?q={action.query.replace(' ', '+')}" 
             self.logger.info(f"Searching Google for: {action.query} (URL: {search_url})")
-            await page.goto(search_url, wait_until="load", timeout=30000)
-            await asyncio.sleep(1.5) 
+            await page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
+            await self.wait_for_page_settle(page)
             dom_state, screenshot, elements, metadata = await self.get_updated_browser_state(f"search_google({action.query})")
             return self.build_action_result(True, f"Searched for '{action.query}'", dom_state, screenshot, elements, metadata)
         except Exception as e:
-            self.logger.error(f"Search error for '{action.query}': {str(e)}", exc_info=True);
-            dom_state, screenshot, elements, metadata = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, screenshot, elements, metadata = await self.get_updated_browser_state("search_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, screenshot, elements, metadata, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Search error for '{action.query}': {str(e)}", "search_error_recovery", page)
 
     async def go_back(self, _: NoParamsAction = Body(...)): 
         page = await self.get_current_page()
         try:
             self.logger.info("Navigating back in browser history.")
-            await page.go_back(wait_until="load", timeout=15000)
-            await asyncio.sleep(1) 
+            await page.go_back(wait_until="domcontentloaded", timeout=15000)
+            await self.wait_for_page_settle(page)
             dom_state, screenshot, elements, metadata = await self.get_updated_browser_state("go_back")
             return self.build_action_result(True, "Navigated back", dom_state, screenshot, elements, metadata)
         except Exception as e:
-            self.logger.error(f"Go back error: {str(e)}", exc_info=True);
-            dom_state, screenshot, elements, metadata = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, screenshot, elements, metadata = await self.get_updated_browser_state("go_back_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, screenshot, elements, metadata, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Go back error: {str(e)}", "go_back_error_recovery", page)
 
     async def wait(self, body: dict = Body(...)): 
         seconds = body.get("seconds", 3) 
+        ocr = body.get("ocr") # Used as the "get current state" call, so callers can force OCR on or off
         page = await self.get_current_page()
         try:
             self.logger.info(f"Waiting for {seconds} seconds.")
             await asyncio.sleep(seconds)
-            dom_state, screenshot, elements, metadata = await self.get_updated_browser_state(f"wait({seconds} seconds)")
+            dom_state, screenshot, elements, metadata = await self.get_updated_browser_state(f"wait({seconds} seconds)", ocr=ocr)
             return self.build_action_result(True, f"Waited for {seconds} seconds", dom_state, screenshot, elements, metadata)
         except Exception as e:
-            self.logger.error(f"Wait error: {str(e)}", exc_info=True);
-            dom_state, screenshot, elements, metadata = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, screenshot, elements, metadata = await self.get_updated_browser_state("wait_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, screenshot, elements, metadata, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Wait error: {str(e)}", "wait_error_recovery", page)
     
     async def click_coordinates(self, action: ClickCoordinatesAction = Body(...)):
         page = await self.get_current_page()
         try:
             self.logger.info(f"Clicking at coordinates: ({action.x}, {action.y})")
             await page.mouse.click(action.x, action.y, delay=random.uniform(50, 150)) 
+            self._dom_state_cache = None # The click may have started a navigation that hasn't committed yet
             await page.wait_for_load_state("load", timeout=15000) 
             await asyncio.sleep(random.uniform(0.5, 1.0)) 
             dom_state, screenshot, elements, metadata = await self.get_updated_browser_state(f"click_coordinates({action.x}, {action.y})")
             return self.build_action_result(True, f"Clicked at ({action.x}, {action.y})", dom_state, screenshot, elements, metadata)
         except Exception as e:
-            self.logger.error(f"Error in click_coordinates ({action.x}, {action.y}): {e}", exc_info=True);
-            dom_state, screenshot, elements, metadata = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, screenshot, elements, metadata = await self.get_updated_browser_state("click_coordinates_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, screenshot, elements, metadata, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in click_coordinates ({action.x}, {action.y}): {e}", "click_coordinates_error_recovery", page)
 
     async def click_element(self, action: ClickElementAction = Body(...)):
         page = await self.get_current_page()
@@ -649,48 +947,30 @@ class BrowserAutomation:
             selector_map = initial_dom_state.selector_map
             if action.index not in selector_map:
                 self.logger.warning(f"Element with index {action.index} not found in selector_map.")
-                dom_state, sc, el, md = await self.get_updated_browser_state(f"click_element_error (index {action.index} not found)")
+                dom_state, sc, el, md = await self.get_updated_browser_state(f"click_element_error (index {action.index} not found)", screenshot=False)
                 return self.build_action_result(False, f"Element with index {action.index} not found in current view.", dom_state, sc, el, md, error=f"Element {action.index} not found")
             
-            js_selector_script = f"""
-            (() => {{
-                const interactiveElements = Array.from(document.querySelectorAll('a, button, input:not([type="hidden"]), select, textarea, [role="button"], [role="link"], [role="checkbox"], [role="radio"], [tabindex]:not([tabindex="-1"])'));
-                const visibleElements = interactiveElements.filter(el => {{ const style = window.getComputedStyle(el); const rect = el.getBoundingClientRect(); return style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0' && rect.width > 0 && rect.height > 0 && el.offsetParent !== null; }});
-                if ({action.index} > 0 && {action.index} <= visibleElements.length) return visibleElements[{action.index - 1}];
-                return null;
-            }})();"""
-            target_element_handle = await page.evaluate_handle(js_selector_script)
-            
-            click_success = False; error_message = ""
-            if await target_element_handle.evaluate("node => node !== null"):
-                try: 
-                    self.logger.info(f"Element handle found for index {action.index}. Attempting click.")
-                    await target_element_handle.scroll_into_view_if_needed(timeout=5000) 
-                    await asyncio.sleep(random.uniform(0.1, 0.3)) 
-                    await target_element_handle.click(timeout=15000, force=True, delay=random.uniform(50,150), trial=True) 
-                    click_success = True
+            click_success = False; error_message = ""; navigated = False
+            try:
+                result, navigated = await self.run_and_follow_navigation(page, lambda: page.evaluate(CLICK_INDEXED_ELEMENT_JS, int(action.index)))
+                click_success = navigated or bool(result and result.get("found"))
+                if click_success:
                     self.logger.info(f"Successfully clicked element at index {action.index}")
-                except Exception as click_error: 
-                    error_message = f"Error clicking element at index {action.index}: {str(click_error)}"
-                    self.logger.error(error_message, exc_info=True)
-            else: 
-                error_message = f"Could not locate live element handle for index {action.index} to click."
-                self.logger.warning(error_message)
-
-            try: await page.wait_for_load_state("networkidle", timeout=15000) 
-            except Exception as e: self.logger.warning(f"Timeout/Error waiting for network idle after click: {e}"); await asyncio.sleep(2) 
+                else:
+                    error_message = f"Could not locate live element for index {action.index} to click."
+                    self.logger.warning(error_message)
+            except Exception as click_error:
+                error_message = f"Error clicking element at index {action.index}: {str(click_error)}"
+                self.logger.error(error_message, exc_info=True)
+
+            if navigated: # A click that didn't navigate leaves nothing to wait for
+                await self.wait_for_page_settle(page, wait_for_network_idle=False)
             
             dom_state, sc, el, md = await self.get_updated_browser_state(f"click_element({action.index})")
             final_message = f"Clicked element {action.index}" if click_success else f"Failed to click element {action.index}. Error: {error_message}"
             return self.build_action_result(click_success, final_message, dom_state, sc, el, md, error=error_message if not click_success else "")
         except Exception as e:
-            self.logger.error(f"Overall error in click_element for index {action.index}: {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("click_element_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Overall error in click_element for index {action.index}: {str(e)}", "click_element_error_recovery", page)
             
     async def input_text(self, action: InputTextAction = Body(...)):
         page = await self.get_current_page()
@@ -698,44 +978,30 @@ class BrowserAutomation:
         try:
             initial_dom_state = await self.get_current_dom_state(); selector_map = initial_dom_state.selector_map
             if action.index not in selector_map:
-                dom_state, sc, el, md = await self.get_updated_browser_state(f"input_text_error (index {action.index} not found)")
+                dom_state, sc, el, md = await self.get_updated_browser_state(f"input_text_error (index {action.index} not found)", screenshot=False)
                 return self.build_action_result(False, f"Element {action.index} not found", dom_state, sc, el, md, error=f"Element {action.index} not found")
             
-            js_selector_script = f"""
-            (() => {{
-                const interactiveElements = Array.from(document.querySelectorAll('a, button, input:not([type="hidden"]), select, textarea, [role="button"], [role="link"], [role="checkbox"], [role="radio"], [tabindex]:not([tabindex="-1"])'));
-                const visibleElements = interactiveElements.filter(el => {{ const style = window.getComputedStyle(el); const rect = el.getBoundingClientRect(); return style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0' && rect.width > 0 && rect.height > 0 && el.offsetParent !== null; }});
-                if ({action.index} > 0 && {action.index} <= visibleElements.length) return visibleElements[{action.index - 1}];
-                return null;
-            }})();"""
-            target_element_handle = await page.evaluate_handle(js_selector_script)
             input_success = False; error_message = ""
-
-            if await target_element_handle.evaluate("node => node !== null"):
-                try: 
-                    await target_element_handle.scroll_into_view_if_needed(timeout=5000)
-                    await target_element_handle.fill(action.text, timeout=10000) 
-                    input_success = True
+            try:
+                result = await page.evaluate(INPUT_INDEXED_ELEMENT_JS, [int(action.index), action.text])
+                input_success = bool(result and result.get("found"))
+                if input_success and not result.get("handled"):
+                    await page.locator(f'[{ELEMENT_INDEX_ATTRIBUTE}="{int(action.index)}"]').fill(action.text, timeout=10000)
+                if input_success:
                     self.logger.info(f"Successfully input text into element {action.index}")
-                except Exception as input_error: 
-                    error_message = f"Error inputting text: {str(input_error)}"
-                    self.logger.error(error_message, exc_info=True)
-            else: 
-                error_message = f"Could not locate live element handle for input at index {action.index}."
-                self.logger.warning(error_message)
-            
+                else:
+                    error_message = f"Could not locate live element for input at index {action.index}."
+                    self.logger.warning(error_message)
+            except Exception as input_error:
+                error_message = f"Error inputting text: {str(input_error)}"
+                self.logger.error(error_message, exc_info=True)
+
             await asyncio.sleep(0.5) 
             dom_state, sc, el, md = await self.get_updated_browser_state(f"input_text({action.index}, '{action.text}')")
             final_message = f"Input '{action.text}' into element {action.index}" if input_success else f"Failed input into element {action.index}. Error: {error_message}"
             return self.build_action_result(input_success, final_message, dom_state, sc, el, md, error=error_message if not input_success else "")
         except Exception as e:
-            self.logger.error(f"Overall error in input_text for index {action.index}: {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("input_text_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Overall error in input_text for index {action.index}: {str(e)}", "input_text_error_recovery", page)
 
     async def send_keys(self, action: SendKeysAction = Body(...)):
         page = await self.get_current_page()
@@ -745,23 +1011,20 @@ class BrowserAutomation:
             # Use page.keyboard.press for more control over individual key events if needed.
             # For simplicity, if '+' is in keys, assume it's a sequence Playwright handles directly.
             # Otherwise, type character by character.
-            if '+' in action.keys and any(mod in action.keys.lower() for mod in ['control', 'alt', 'shift', 'meta']):
-                 await page.keyboard.press(action.keys, delay=random.uniform(30,100))
-            else:
-                for char_or_key in action.keys: # Type character by character for simple text
-                    await page.keyboard.type(char_or_key, delay=random.uniform(50,150))
-            
-            await page.wait_for_load_state("networkidle", timeout=10000) 
+            async def press_keys():
+                if '+' in action.keys and any(mod in action.keys.lower() for mod in ['control', 'alt', 'shift', 'meta']):
+                     await page.keyboard.press(action.keys, delay=random.uniform(30,100))
+                else:
+                    for char_or_key in action.keys: # Type character by character for simple text
+                        await page.keyboard.type(char_or_key, delay=random.uniform(50,150))
+
+            _, navigated = await self.run_and_follow_navigation(page, press_keys, detect_grace_ms=NAVIGATION_DETECT_GRACE_MS)
+            if navigated:
+                await self.wait_for_page_settle(page, wait_for_network_idle=False)
             dom_state, sc, el, md = await self.get_updated_browser_state(f"send_keys({action.keys})")
             return self.build_action_result(True, f"Sent keys: {action.keys}", dom_state, sc, el, md)
         except Exception as e:
-            self.logger.error(f"Error in send_keys '{action.keys}': {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("send_keys_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in send_keys '{action.keys}': {str(e)}", "send_keys_error_recovery", page)
 
     async def switch_tab(self, action: SwitchTabAction = Body(...)):
         page = await self.get_current_page() 
@@ -777,16 +1040,10 @@ class BrowserAutomation:
             else:
                 err_msg = f"Tab {action.page_id} not found. Valid: 0-{len(self.pages)-1 if self.pages else 'None'}"
                 self.logger.warning(err_msg)
-                csd, css, cse, csm = await self.get_updated_browser_state("switch_tab_error (invalid_index)")
+                csd, css, cse, csm = await self.get_updated_browser_state("switch_tab_error (invalid_index)", screenshot=False)
                 return self.build_action_result(False, err_msg, csd, css, cse, csm, error=err_msg)
         except Exception as e:
-            self.logger.error(f"Error in switch_tab to {action.page_id}: {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("switch_tab_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in switch_tab to {action.page_id}: {str(e)}", "switch_tab_error_recovery", page)
 
     async def open_tab(self, action: OpenTabAction = Body(...)):
         page = await self.get_current_page() 
@@ -795,21 +1052,14 @@ class BrowserAutomation:
             if not self.context:
                  self.logger.error("Browser context not available for opening new tab.")
                  raise Exception("Browser context unavailable")
-            new_page = await self.context.new_page() 
-            await new_page.goto(action.url, wait_until="load", timeout=30000) 
-            await asyncio.sleep(1.5) 
+            new_page = await self.acquire_page()
+            await new_page.goto(action.url, wait_until="domcontentloaded", timeout=30000) 
             self.pages.append(new_page); self.current_page_index=len(self.pages)-1
             await new_page.bring_to_front()
             dom_state, sc, el, md = await self.get_updated_browser_state(f"open_tab({action.url})")
             return self.build_action_result(True, f"Opened tab {action.url}. Active tab index: {self.current_page_index}.", dom_state, sc, el, md)
         except Exception as e:
-            self.logger.error(f"Error opening tab for URL {action.url}: {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("open_tab_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error opening tab for URL {action.url}: {str(e)}", "open_tab_error_recovery", page)
 
     async def close_tab(self, action: CloseTabAction = Body(...)):
         page = await self.get_current_page()
@@ -818,17 +1068,16 @@ class BrowserAutomation:
             if not (0 <= action.page_id < len(self.pages)):
                 err_msg = f"Tab {action.page_id} not found. Valid indices: 0-{len(self.pages)-1 if self.pages else 'None'}"
                 self.logger.warning(err_msg)
-                csd, css, cse, csm = await self.get_updated_browser_state("close_tab_error (invalid_index)")
+                csd, css, cse, csm = await self.get_updated_browser_state("close_tab_error (invalid_index)", screenshot=False)
                 return self.build_action_result(False, err_msg, csd, css, cse, csm, error=err_msg)
             
             if len(self.pages) == 1 and action.page_id == 0:
                 self.logger.info("Attempting to close the last tab. Creating a new blank tab first.")
-                if not self.context: raise Exception("Browser context unavailable to create new tab.")
-                bp = await self.context.new_page(); await bp.goto("about:blank"); self.pages.append(bp)
+                self.pages.append(await self.acquire_page())
             
             page_to_close = self.pages[action.page_id]; url_closed = page_to_close.url
             if not page_to_close.is_closed(): 
-                await page_to_close.close(timeout=5000) 
+                await self.release_page(page_to_close)
                 self.logger.info(f"Closed page at index {action.page_id}, URL: {url_closed}")
             else:
                 self.logger.info(f"Page at index {action.page_id} (URL: {url_closed}) was already closed.")
@@ -837,8 +1086,7 @@ class BrowserAutomation:
 
             if not self.pages: 
                 self.logger.info("All tabs were closed. Creating a new blank tab.")
-                if not self.context: raise Exception("Browser context unavailable to create new tab after closing all.")
-                bp = await self.context.new_page(); await bp.goto("about:blank"); self.pages.append(bp); self.current_page_index=0
+                self.pages.append(await self.acquire_page()); self.current_page_index=0
             elif self.current_page_index >= action.page_id: 
                 self.current_page_index=max(0,self.current_page_index-1)
                 self.current_page_index=min(self.current_page_index,len(self.pages)-1 if self.pages else 0) 
@@ -847,13 +1095,7 @@ class BrowserAutomation:
             dom_state, sc, el, md = await self.get_updated_browser_state(f"close_tab({action.page_id})")
             return self.build_action_result(True, f"Closed tab {action.page_id} (URL: {url_closed}). Active tab index: {self.current_page_index}.", dom_state, sc, el, md)
         except Exception as e:
-            self.logger.error(f"Error in close_tab for page_id {action.page_id}: {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("close_tab_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in close_tab for page_id {action.page_id}: {str(e)}", "close_tab_error_recovery", page)
     
     async def extract_content(self, action: ExtractContentAction = Body(...)):
         page = await self.get_current_page()
@@ -868,45 +1110,50 @@ class BrowserAutomation:
                     if (mainElement) break;
                 }
                 if (!mainElement) mainElement = document.body;
-                const selectorsToRemove = ['script', 'style', 'nav', 'header', 'footer', 'aside', 'form', 'noscript', '.advertisement', '.ad', '.sidebar', 'iframe', 'figure > figcaption', 'figure > img', 'img']; 
-                selectorsToRemove.forEach(selector => { mainElement.querySelectorAll(selector).forEach(el => el.remove()); });
-                let text = ""; const walker = document.createTreeWalker(mainElement, NodeFilter.SHOW_TEXT, null, false); let node;
+                // Excluded subtrees are skipped by the walker rather than removed, so the live page is left intact.
+                const skipSelector = 'script, style, nav, header, footer, aside, form, noscript, .advertisement, .ad, .sidebar, iframe, figure > figcaption, figure > img, img';
+                const blockTags = new Set(['P', 'H1', 'H2', 'H3', 'H4', 'H5', 'H6', 'LI', 'BLOCKQUOTE', 'PRE', 'DIV', 'TD', 'TH']);
+                const walker = document.createTreeWalker(mainElement, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+                    acceptNode: n => n.nodeType === Node.ELEMENT_NODE
+                        ? (n.matches(skipSelector) ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_SKIP)
+                        : (n.nodeValue.trim() ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_REJECT)
+                });
+                // offsetParent is null for hidden elements (and for fixed ones, which getClientRects tells apart);
+                // text nodes mostly share parents, so each parent is checked once.
+                const visibility = new Map();
+                const isVisible = el => {
+                    let visible = visibility.get(el);
+                    if (visible === undefined) {
+                        visible = el === document.body || el.offsetParent !== null || el.getClientRects().length > 0;
+                        visibility.set(el, visible);
+                    }
+                    return visible;
+                };
+                let text = ""; let node;
                 while(node = walker.nextNode()) {
                     const parent = node.parentElement;
-                    if (parent && ['P', 'H1', 'H2', 'H3', 'H4', 'H5', 'H6', 'LI', 'BLOCKQUOTE', 'PRE', 'DIV', 'TD', 'TH'].includes(parent.tagName)) { 
-                         text += node.nodeValue.trim() + '\\n';
-                    } else { text += node.nodeValue.trim() + ' '; }
+                    if (!parent || !isVisible(parent)) continue;
+                    text += node.nodeValue.trim() + (blockTags.has(parent.tagName) ? '\\n' : ' ');
                 }
                 return text.replace(/\\n\\s*\\n/g, '\\n').trim();
             })();
             """)
-            dom_state, sc, el, md = await self.get_updated_browser_state(f"extract_content({action.goal})")
+            dom_state, sc, el, md = await self.get_updated_browser_state(f"extract_content({action.goal})", screenshot=False)
             return self.build_action_result(True, f"Content extracted for: {action.goal}", dom_state, sc, el, md, content=extracted_text)
         except Exception as e:
-            self.logger.error(f"Error in extract_content for goal '{action.goal}': {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("extract_content_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in extract_content for goal '{action.goal}': {str(e)}", "extract_content_error_recovery", page)
 
     async def save_pdf(self, _: NoParamsAction = Body(...)): 
         page = await self.get_current_page()
         try:
             self.logger.info("Saving current page as PDF.")
             filename=f"page_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{random.randint(1000,9999)}.pdf"; pdf_ws_path=f"/workspace/{filename}"
-            await page.pdf(path=pdf_ws_path, format='A4', print_background=True, timeout=60000) 
-            dom_state, sc, el, md = await self.get_updated_browser_state("save_pdf")
+            pdf_bytes = await page.pdf(format='A4', print_background=True, timeout=60000)
+            await asyncio.to_thread(self._write_file_sync, pdf_ws_path, pdf_bytes) # Large PDFs would stall the event loop
+            dom_state, sc, el, md = await self.get_updated_browser_state("save_pdf", screenshot=False)
             return self.build_action_result(True, f"Saved PDF: {filename} (in /workspace)", dom_state, sc, el, md) 
         except Exception as e:
-            self.logger.error(f"Error in save_pdf: {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("save_pdf_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in save_pdf: {str(e)}", "save_pdf_error_recovery", page)
 
     async def scroll_down(self, action: ScrollAction = Body(default_factory=ScrollAction)):
         page = await self.get_current_page()
@@ -921,13 +1168,7 @@ class BrowserAutomation:
             dom_state, sc, el, md = await self.get_updated_browser_state(f"scroll_down({amount_str})")
             return self.build_action_result(True, f"Scrolled down by {amount_str}", dom_state, sc, el, md)
         except Exception as e:
-            self.logger.error(f"Error in scroll_down: {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("scroll_down_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in scroll_down: {str(e)}", "scroll_down_error_recovery", page)
 
     async def scroll_up(self, action: ScrollAction = Body(default_factory=ScrollAction)):
         page = await self.get_current_page()
@@ -942,13 +1183,7 @@ class BrowserAutomation:
             dom_state, sc, el, md = await self.get_updated_browser_state(f"scroll_up({amount_str})")
             return self.build_action_result(True, f"Scrolled up by {amount_str}", dom_state, sc, el, md)
         except Exception as e:
-            self.logger.error(f"Error in scroll_up: {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("scroll_up_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in scroll_up: {str(e)}", "scroll_up_error_recovery", page)
             
     async def scroll_to_text(self, body: dict = Body(...)): 
         text_to_find = body.get("text")
@@ -957,41 +1192,19 @@ class BrowserAutomation:
             return self.build_action_result(False, "Text to find required", None, "", "", {}, error="Missing text")
         try:
             self.logger.info(f"Scrolling to text: '{text_to_find}'")
-            found = False
+            # get_by_text matches case-insensitively on a whitespace-normalized substring.
+            locator = page.get_by_text(text_to_find, exact=False).first
             try:
-                locator = page.locator(f"text=/{re.escape(text_to_find)}/i").first 
-                if await locator.count() > 0:
-                    await locator.scroll_into_view_if_needed(timeout=10000) 
-                    found = True
-                if found: await asyncio.sleep(0.75) 
-            except Exception as scroll_ex: self.logger.warning(f"Playwright locator scroll for '{text_to_find}' failed: {scroll_ex}")
-            
-            if not found: 
-                self.logger.info(f"Fallback: Trying JS scroll for '{text_to_find}'")
-                js_text_to_find = json.dumps(text_to_find)
-                scroll_script = f"""
-                (() => {{
-                    const textToFind = {js_text_to_find};
-                    const allElements = Array.from(document.querySelectorAll('*'));
-                    for (const el of allElements) {{
-                        if (el.innerText && el.innerText.toLowerCase().includes(textToFind.toLowerCase())) {{
-                            el.scrollIntoView({{behavior: 'smooth', block: 'center'}}); return true;
-                        }} }} return false;
-                }})();"""
-                found = await page.evaluate(scroll_script)
-                if found: await asyncio.sleep(1.0) 
+                await locator.scroll_into_view_if_needed(timeout=3000)
+                found = True
+            except PlaywrightTimeoutError:
+                found = False
 
             dom_state, sc, el, md = await self.get_updated_browser_state(f"scroll_to_text({text_to_find})")
             message = f"Scrolled to text: '{text_to_find}'" if found else f"Text '{text_to_find}' not found or not visible."
             return self.build_action_result(found, message, dom_state, sc, el, md, error="" if found else f"Text '{text_to_find}' not found")
         except Exception as e:
-            self.logger.error(f"Error in scroll_to_text for '{text_to_find}': {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("scroll_to_text_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in scroll_to_text for '{text_to_find}': {str(e)}", "scroll_to_text_error_recovery", page)
 
     async def get_dropdown_options(self, body: dict = Body(...)): 
         index = body.get("index")
@@ -1001,20 +1214,13 @@ class BrowserAutomation:
             self.logger.info(f"Getting dropdown options for element at index: {index}")
             initial_dom_state=await self.get_current_dom_state(); selector_map=initial_dom_state.selector_map
             if index not in selector_map:
-                dom_state, sc, el, md = await self.get_updated_browser_state(f"get_dropdown_options_error (index {index} not found)")
+                dom_state, sc, el, md = await self.get_updated_browser_state(f"get_dropdown_options_error (index {index} not found)", screenshot=False)
                 return self.build_action_result(False, f"Element {index} not found", dom_state, sc, el, md, error=f"Element {index} not found")
             
             element_node = selector_map[index]; options = []
-            js_selector_script = f"""
-            (() => {{
-                const interactiveElements = Array.from(document.querySelectorAll('a, button, input:not([type="hidden"]), select, textarea, [role="button"], [role="link"], [role="checkbox"], [role="radio"], [tabindex]:not([tabindex="-1"])'));
-                const visibleElements = interactiveElements.filter(el => {{ const style = window.getComputedStyle(el); const rect = el.getBoundingClientRect(); return style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0' && rect.width > 0 && rect.height > 0 && el.offsetParent !== null; }});
-                if ({index} > 0 && {index} <= visibleElements.length) return visibleElements[{index - 1}];
-                return null;
-            }})();"""
-            target_element_handle = await page.evaluate_handle(js_selector_script)
-
-            if await target_element_handle.evaluate("node => node !== null"):
+            target_element_handle = await self.get_element_handle(page, index)
+
+            if target_element_handle is not None:
                 if element_node.tag_name.lower() == 'select':
                     options = await target_element_handle.evaluate("selectElement => Array.from(selectElement.options).map((opt, idx) => ({index:idx,text:opt.text,value:opt.value}))")
                 else: 
@@ -1023,16 +1229,10 @@ class BrowserAutomation:
             else:
                  self.logger.warning(f"Could not get handle for dropdown element at index {index}.")
             
-            dom_state, sc, el, md = await self.get_updated_browser_state(f"get_dropdown_options({index})")
+            dom_state, sc, el, md = await self.get_updated_browser_state(f"get_dropdown_options({index})", screenshot=False)
             return self.build_action_result(True, f"Retrieved {len(options)} options for dropdown at index {index}", dom_state, sc, el, md, content=json.dumps(options))
         except Exception as e:
-            self.logger.error(f"Error in get_dropdown_options for index {index}: {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("get_dropdown_options_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in get_dropdown_options for index {index}: {str(e)}", "get_dropdown_options_error_recovery", page)
 
     async def select_dropdown_option(self, body: dict = Body(...)): 
         index = body.get("index"); option_text = body.get("text")
@@ -1042,27 +1242,20 @@ class BrowserAutomation:
             self.logger.info(f"Selecting option '{option_text}' from dropdown at index {index}")
             initial_dom_state = await self.get_current_dom_state(); selector_map = initial_dom_state.selector_map
             if index not in selector_map:
-                dom_state, sc, el, md = await self.get_updated_browser_state(f"select_dropdown_error (index {index} not found)")
+                dom_state, sc, el, md = await self.get_updated_browser_state(f"select_dropdown_error (index {index} not found)", screenshot=False)
                 return self.build_action_result(False, f"Element {index} not found", dom_state, sc, el, md, error=f"Element {index} not found")
             
-            js_selector_script = f"""
-            (() => {{
-                const interactiveElements = Array.from(document.querySelectorAll('a, button, input:not([type="hidden"]), select, textarea, [role="button"], [role="link"], [role="checkbox"], [role="radio"], [tabindex]:not([tabindex="-1"])'));
-                const visibleElements = interactiveElements.filter(el => {{ const style = window.getComputedStyle(el); const rect = el.getBoundingClientRect(); return style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0' && rect.width > 0 && rect.height > 0 && el.offsetParent !== null; }});
-                if ({index} > 0 && {index} <= visibleElements.length) return visibleElements[{index - 1}];
-                return null;
-            }})();"""
-            target_element_handle = await page.evaluate_handle(js_selector_script)
+            target_element_handle = await self.get_element_handle(page, index)
             selected = False
 
-            if await target_element_handle.evaluate("node => node !== null"):
+            if target_element_handle is not None:
                 if await target_element_handle.evaluate("node => node.tagName.toLowerCase() === 'select'"):
                     await target_element_handle.select_option(label=option_text, timeout=10000) 
                     selected = True
                 else: 
                     await target_element_handle.click(timeout=5000)
                     await asyncio.sleep(0.75) 
-                    option_locator = page.locator(f"text=/{re.escape(option_text)}/i").first 
+                    option_locator = page.get_by_text(option_text, exact=False).first
                     if await option_locator.count() > 0:
                         await option_locator.click(timeout=5000)
                         selected = True
@@ -1074,13 +1267,7 @@ class BrowserAutomation:
             message = f"Selected '{option_text}' from dropdown {index}" if selected else f"Failed to select '{option_text}' from dropdown {index}"
             return self.build_action_result(selected,message,dom_state,sc,el,md,error="" if selected else "Option not found/selection failed")
         except Exception as e:
-            self.logger.error(f"Error in select_dropdown_option for index {index}, text '{option_text}': {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("select_dropdown_option_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in select_dropdown_option for index {index}, text '{option_text}': {str(e)}", "select_dropdown_option_error_recovery", page)
 
     async def drag_drop(self, action: DragDropAction = Body(...)):
         page = await self.get_current_page()
@@ -1103,16 +1290,10 @@ class BrowserAutomation:
             dom_state, sc, el, md = await self.get_updated_browser_state(f"drag_drop")
             return self.build_action_result(success, message, dom_state, sc, el, md, error="" if success else message)
         except Exception as e:
-            self.logger.error(f"Error in drag_drop: {str(e)}", exc_info=True);
-            dom_state, sc, el, md = None, "", "", {}; current_url = "unknown"
-            try: 
-                dom_state, sc, el, md = await self.get_updated_browser_state("drag_drop_error_recovery")
-                if page: current_url = page.url
-            except: pass
-            return self.build_action_result(False, str(e), dom_state, sc, el, md, error=str(e), fallback_url=current_url)
+            return await self.build_error_result(e, f"Error in drag_drop: {str(e)}", "drag_drop_error_recovery", page)
 
 automation_service = BrowserAutomation()
-api_app = FastAPI()
+api_app = FastAPI(default_response_class=DefaultResponseClass)
 
 @api_app.get("/api")
 async def health_check(): return {"status": "ok", "message": "Browser API server is running"}
@@ -1,17 +1,15 @@
 # frontend_tool_schemas.py
+# agno_adapter also puts the project root on sys.path for the `common` import below
 from agno_adapter import FrontendToolSchema
-import sys
-import os
-# Add the project root to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from common.frontend_tools import (
     FrontendToolName,
     get_all_frontend_tool_schemas
 )
 
-# Convert the Python dictionaries to FrontendToolSchema objects
+# Convert the Python dictionaries to FrontendToolSchema objects.
+# The schemas are generated from the frontend tool definitions, so validation is skipped.
 frontend_tools = [
-    FrontendToolSchema(
+    FrontendToolSchema.model_construct(
         name=schema["name"],
         description=schema["description"],
         parameters=schema["parameters"]
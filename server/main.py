@@ -83,7 +83,7 @@ async def handle_chat(request: ChatRequest):
     user_id = request.userId or request.data.get("userId") if request.data else None
 
     print(f"Streaming response with session_id: {session_id}, user_id: {user_id}")
-    vercel_stream = app.state.adapter.stream_response(
+    vercel_stream = await app.state.adapter.stream_response(
         messages=request.messages or [],
         session_id=session_id,
         user_id=user_id
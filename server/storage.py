@@ -0,0 +1,29 @@
+# storage.py
+from pathlib import Path
+
+from agno.storage.sqlite import SqliteStorage
+from sqlalchemy import create_engine, event
+
+_DB_FILE = Path("tmp") / "persistent_memory.db"
+
+# This module is imported once per process, so the directory is prepared once
+# here and SqliteStorage is handed a ready engine instead of a file path.
+_DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+_DB_ENGINE = create_engine(f"sqlite:///{_DB_FILE.resolve()}")
+
+
+@event.listens_for(_DB_ENGINE, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL with relaxed syncing to cut the fsync cost of each session write."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+# Single storage instance shared by every agent module so they all go through
+# one engine / connection pool instead of each opening the same SQLite file.
+AGENT_STORAGE = SqliteStorage(
+    table_name="agent_sessions",
+    db_engine=_DB_ENGINE,
+)